@@ -1,15 +1,52 @@
+import logging
+
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils.translation import gettext_lazy as _
 
-from .models import OTPVerificationSession, User
+from core.changelist import ScalableAdminMixin
+
+from . import exports
+from .models import DeviceProfile, LoginRollup, OTPVerificationSession, User
+
+logger = logging.getLogger(__name__)
+
+
+def _export(request, queryset, fmt, compress=False):
+    logger.info("Admin export of %s as %s started by user %s", exports.EXPORTS[queryset.model].name, fmt, request.user.pk)
+    return exports.streaming_response(queryset, fmt, compress)
+
+
+@admin.action(description=_("Export selected as CSV"), permissions=["view"])
+def export_csv(modeladmin, request, queryset):
+    return _export(request, queryset, "csv")
+
+
+@admin.action(description=_("Export selected as CSV (gzip)"), permissions=["view"])
+def export_csv_gzip(modeladmin, request, queryset):
+    return _export(request, queryset, "csv", compress=True)
+
+
+@admin.action(description=_("Export selected as JSON Lines (gzip)"), permissions=["view"])
+def export_jsonl_gzip(modeladmin, request, queryset):
+    return _export(request, queryset, "jsonl", compress=True)
+
+
+EXPORT_ACTIONS = (export_csv, export_csv_gzip, export_jsonl_gzip)
 
 
 @admin.register(User)
-class UserAdmin(BaseUserAdmin):
-    ordering = ("date_joined",)
+class UserAdmin(ScalableAdminMixin, BaseUserAdmin):
+    ordering = ("date_joined", "id")
     list_display = ("phone_number", "is_staff", "is_superuser", "date_joined")
-    search_fields = ("phone_number", "first_name", "last_name")
+    search_fields = ("=id", "^phone_number", "^first_name", "^last_name")
+    search_help_text = _("User ID, or the start of a phone number (e.g. +99890), first name or last name")
+    search_prefix_field = "phone_number"
+    search_name_fields = ("first_name", "last_name")
+    keyset_field = "date_joined"
+    keyset_descending = False
+    list_filter = ("date_joined", *BaseUserAdmin.list_filter)
+    actions = EXPORT_ACTIONS
     fieldsets = (
         (None, {"fields": ("phone_number", "password")}),
         (_("Personal info"), {"fields": ("first_name", "last_name")}),
@@ -29,7 +66,50 @@ class UserAdmin(BaseUserAdmin):
 
 
 @admin.register(OTPVerificationSession)
-class OTPVerificationSessionAdmin(admin.ModelAdmin):
+class OTPVerificationSessionAdmin(ScalableAdminMixin, admin.ModelAdmin):
+    ordering = ("-created_at", "-id")
     list_display = ("address", "id", "is_verified", "attempts", "expires_at", "consumed_at")
-    search_fields = ("address", "id")
-    list_filter = ("is_verified", "consumed_at")
+    search_fields = ("=id", "^address")
+    search_help_text = _("Session ID or the start of an address, e.g. +99890")
+    search_prefix_field = "address"
+    keyset_field = "created_at"
+    actions = EXPORT_ACTIONS
+    list_filter = ("created_at", "is_verified", "consumed_at")
+    raw_id_fields = ("device_profile",)
+    readonly_fields = ("login_metadata",)
+
+
+@admin.register(DeviceProfile)
+class DeviceProfileAdmin(admin.ModelAdmin):
+    list_display = ("id", "platform", "device_os", "device_model", "app_version", "lang", "theme", "created_at")
+    list_filter = ("platform",)
+    search_fields = ("device_model", "app_version")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        # Workers cache profile ids.
+        return False
+
+
+@admin.register(LoginRollup)
+class LoginRollupAdmin(admin.ModelAdmin):
+    """Read-only view of the rollups written by ``rollup_logins``."""
+
+    list_display = ("hour", "platform", "app_version", "referral_code", "logins")
+    list_filter = ("platform", "app_version")
+    search_fields = ("=referral_code",)
+    date_hierarchy = "hour"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,24 @@
+from rest_framework import serializers
+
+from apps.accounts.models import LoginRollup
+
+
+class LoginAnalyticsQuerySerializer(serializers.Serializer):
+    INTERVAL_CHOICES = ("hour", "day")
+    MAX_DAYS = 366
+
+    start = serializers.DateField()
+    end = serializers.DateField(help_text="Inclusive.")
+    interval = serializers.ChoiceField(choices=INTERVAL_CHOICES, default="day")
+    group_by = serializers.MultipleChoiceField(choices=LoginRollup.DIMENSIONS, required=False)
+    platform = serializers.CharField(required=False, allow_blank=True)
+    app_version = serializers.CharField(required=False, allow_blank=True)
+    referral_code = serializers.CharField(required=False, allow_blank=True)
+
+    def validate(self, attrs):
+        if attrs["end"] < attrs["start"]:
+            raise serializers.ValidationError({"end": "End must not be before start."})
+        if (attrs["end"] - attrs["start"]).days >= self.MAX_DAYS:
+            raise serializers.ValidationError({"end": f"At most {self.MAX_DAYS} days per request."})
+        return attrs
+
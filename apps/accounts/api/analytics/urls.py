@@ -0,0 +1,7 @@
+from django.urls import path
+
+from .views import LoginAnalyticsView
+
+urlpatterns = [
+    path('logins/', LoginAnalyticsView.as_view(), name='analytics-logins'),
+]
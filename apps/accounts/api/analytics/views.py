@@ -0,0 +1,52 @@
+from datetime import datetime, time, timedelta
+
+from django.db.models import F, Sum
+from django.db.models.functions import TruncDay
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.accounts.models import LoginRollup, RollupWatermark
+from apps.accounts.rollups import WATERMARK_NAME
+from core.swagger import swagger_auto_schema
+
+from .serializers import LoginAnalyticsQuerySerializer
+
+
+class LoginAnalyticsView(APIView):
+    """Reads ``LoginRollup`` only; the raw session table is never scanned here."""
+
+    permission_classes = [IsAdminUser]
+    serializer_class = LoginAnalyticsQuerySerializer
+
+    # Staff-only and outside the schema's /api/v1/auth basePath; documented in deploy/README.md.
+    @swagger_auto_schema(auto_schema=None)
+    def get(self, request):
+        """
+        Login counts per hour or day between two dates (inclusive, server time zone), optionally split by
+        platform, app version and referral code. ``up_to`` tells how fresh the rollups are.
+        """
+        serializer = LoginAnalyticsQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+
+        tz = timezone.get_current_timezone()
+        rollups = LoginRollup.objects.filter(
+            hour__gte=datetime.combine(params["start"], time.min, tzinfo=tz),
+            hour__lt=datetime.combine(params["end"] + timedelta(days=1), time.min, tzinfo=tz),
+        )
+        for dimension in LoginRollup.DIMENSIONS:
+            if dimension in params:
+                rollups = rollups.filter(**{dimension: params[dimension]})
+
+        group_by = [dimension for dimension in LoginRollup.DIMENSIONS if dimension in params.get("group_by", ())]
+        rows = (
+            rollups.annotate(period=TruncDay("hour") if params["interval"] == "day" else F("hour"))
+            .values("period", *group_by)
+            .annotate(logins=Sum("logins"))
+            .order_by("period", *group_by)
+        )
+        up_to = RollupWatermark.objects.filter(name=WATERMARK_NAME).values_list("position", flat=True).first()
+        return Response({"up_to": up_to, "results": list(rows)}, status=status.HTTP_200_OK)
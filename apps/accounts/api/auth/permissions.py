@@ -0,0 +1,15 @@
+import hmac
+
+from django.conf import settings
+from rest_framework.permissions import BasePermission
+
+
+class IsInternalService(BasePermission):
+    """Allows requests carrying the shared ``INTERNAL_API_TOKEN`` in ``X-Internal-Token``."""
+
+    message = "Internal service token required."
+
+    def has_permission(self, request, view) -> bool:
+        expected = settings.INTERNAL_API_TOKEN
+        provided = request.headers.get("X-Internal-Token", "")
+        return bool(expected) and hmac.compare_digest(provided.encode(), expected.encode())
@@ -49,6 +49,16 @@ class LoginSerializer(serializers.Serializer):
     referral_code = serializers.CharField(required=False, allow_blank=True)
 
 
+class TokenIntrospectSerializer(serializers.Serializer):
+    MAX_TOKENS = 500
+
+    tokens = serializers.ListField(
+        child=serializers.CharField(),
+        allow_empty=False,
+        max_length=MAX_TOKENS,
+    )
+
+
 class RequestOtpResponseSerializer(serializers.Serializer):
     session = serializers.UUIDField()
     retry_after = serializers.IntegerField(min_value=0)
@@ -63,3 +73,13 @@ class LoginResponseSerializer(serializers.Serializer):
     access = serializers.CharField()
     refresh = serializers.CharField()
 
+
+class TokenIntrospectResultSerializer(serializers.Serializer):
+    active = serializers.BooleanField()
+    user_id = serializers.UUIDField(required=False)
+    claims = serializers.DictField(required=False)
+    error = serializers.CharField(required=False)
+
+
+class TokenIntrospectResponseSerializer(serializers.Serializer):
+    results = TokenIntrospectResultSerializer(many=True)
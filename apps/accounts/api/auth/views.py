@@ -1,19 +1,30 @@
+import hashlib
+import json
 import logging
 import random
+import urllib.request
 from typing import Tuple
 
+from django.conf import settings
+from django.core.cache import cache
 from django.db import transaction
 from django.utils import timezone
-from drf_yasg.utils import swagger_auto_schema
 from rest_framework import status
-from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.exceptions import APIException, NotFound, ValidationError
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
 
 from apps.accounts.models import OTPVerificationSession, User
+from core import metrics
+from core.locks import LockTimeout, single_flight
+from core.swagger import swagger_auto_schema
+from core.timing import section
 
+from .permissions import IsInternalService
 from .serializers import (
     LoginResponseSerializer,
     LoginSerializer,
@@ -21,7 +32,10 @@ from .serializers import (
     RequestOtpSerializer,
     SubmitOtpResponseSerializer,
     SubmitOtpSerializer,
+    TokenIntrospectResponseSerializer,
+    TokenIntrospectSerializer,
 )
+from .validators import validate_login, validate_request_otp, validate_submit_otp, validate_token_introspect
 
 logger = logging.getLogger(__name__)
 
@@ -30,13 +44,37 @@ class MockSMSService:
     """Simple SMS client used for local development and tests."""
 
     def send_otp(self, phone_number: str, otp_code: str) -> None:
-        logger.info("Mock SMS → %s: %s", phone_number, otp_code)
+        # Never log the code itself; locally use TEST_PHONE/TEST_OTP or SMS_SINK_URL.
+        logger.info("Mock SMS → %s", f"{phone_number[:6]}***{phone_number[-2:]}")
+
+    def ping(self) -> None:
+        """Raise if the SMS provider is unreachable; the mock always is reachable."""
+
+
+class SinkSMSService(MockSMSService):
+    """Posts codes to a local HTTP sink (``settings.SMS_SINK_URL``); used by ``loadtest_auth`` only."""
+
+    def __init__(self, url: str):
+        self.url = url
+
+    def send_otp(self, phone_number: str, otp_code: str) -> None:
+        body = json.dumps({"phone_number": phone_number, "otp_code": otp_code}).encode()
+        request = urllib.request.Request(self.url, data=body, headers={"Content-Type": "application/json"})
+        urllib.request.urlopen(request, timeout=2).close()
+
+
+class OTPIssueInProgress(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "A code for this number is still being sent; try again shortly."
+    default_code = "otp_issue_in_progress"
 
 
 class OTPWorkflowService:
     TEST_PHONE = "+998999990000"
     TEST_OTP = "0571"
     OTP_DIGITS = 4
+    # Longest a repeated request waits for the one already issuing a code.
+    ISSUE_LOCK_TIMEOUT = 5
 
     def __init__(self, sms_client: MockSMSService | None = None):
         self.sms_client = sms_client or MockSMSService()
@@ -54,25 +92,87 @@ class OTPWorkflowService:
         )
 
     def issue_code(self, address: str, client_secret: str = "") -> Tuple[OTPVerificationSession, bool, int]:
-        session = self._get_active_session(address)
-        if session and not session.can_retry():
-            return session, True, session.seconds_until_retry()
-
-        otp_code = self._generate_otp(address)
-        if session and not session.is_verified:
-            session.mark_sent(otp_code, client_secret)
-        else:
-            session = OTPVerificationSession.objects.create(
-                address=address,
-                client_secret=client_secret or "",
-                otp_code=otp_code,
-                expires_at=timezone.now() + OTPVerificationSession.OTP_TTL,
-            )
-        self.sms_client.send_otp(address, otp_code)
+        # Repeated taps on "send code" race here; the lock makes the first request issue the code and the
+        # rest wait for it, then find its session inside RESEND_INTERVAL and return it as throttled.
+        try:
+            with single_flight(f"otp:issue:{address}", timeout=self.ISSUE_LOCK_TIMEOUT):
+                session = self._get_active_session(address)
+                if session and not session.can_retry():
+                    metrics.OTP_THROTTLED.inc()
+                    return session, True, session.seconds_until_retry()
+
+                otp_code = self._generate_otp(address)
+                if session and not session.is_verified:
+                    session.mark_sent(otp_code, client_secret)
+                else:
+                    session = OTPVerificationSession.objects.create(
+                        address=address,
+                        client_secret=client_secret or "",
+                        otp_code=otp_code,
+                        expires_at=timezone.now() + OTPVerificationSession.OTP_TTL,
+                    )
+        except LockTimeout:
+            raise OTPIssueInProgress()
+        with section("sms"), metrics.SMS_SEND_DURATION.time():
+            self.sms_client.send_otp(address, otp_code)
+        metrics.OTP_ISSUED.inc()
         return session, False, 0
 
 
-otp_service = OTPWorkflowService()
+otp_service = OTPWorkflowService(SinkSMSService(settings.SMS_SINK_URL) if settings.SMS_SINK_URL else None)
+
+
+class TokenIntrospectionService:
+    """Verifies batches of access tokens and caches the outcome by token hash."""
+
+    CACHE_PREFIX = "auth:introspect:"
+    CACHE_TTL = 30
+
+    def _cache_key(self, token: str) -> str:
+        return self.CACHE_PREFIX + hashlib.sha256(token.encode()).hexdigest()
+
+    def introspect(self, tokens: list[str]) -> list[dict]:
+        unique_tokens = list(dict.fromkeys(tokens))
+        keys = {token: self._cache_key(token) for token in unique_tokens}
+        cached = cache.get_many(keys.values())
+        results = {token: cached[key] for token, key in keys.items() if key in cached}
+
+        fresh, expiring = {}, []
+        decoded = {}
+        for token in unique_tokens:
+            if token in results:
+                continue
+            try:
+                decoded[token] = AccessToken(token).payload
+            except TokenError as exc:
+                results[token] = fresh[keys[token]] = {"active": False, "error": str(exc)}
+
+        user_ids = {payload.get(jwt_settings.USER_ID_CLAIM) for payload in decoded.values()}
+        users = User.objects.filter(id__in=[user_id for user_id in user_ids if user_id], is_active=True)
+        active_user_ids = {str(user_id) for user_id in users.values_list("id", flat=True)}
+
+        now = timezone.now().timestamp()
+        for token, payload in decoded.items():
+            user_id = payload.get(jwt_settings.USER_ID_CLAIM)
+            if user_id not in active_user_ids:
+                results[token] = fresh[keys[token]] = {"active": False, "error": "User not found or inactive."}
+                continue
+            results[token] = {"active": True, "user_id": user_id, "claims": payload}
+            # Never cache a token as active past its own expiry.
+            ttl = min(self.CACHE_TTL, int(payload["exp"] - now))
+            if ttl == self.CACHE_TTL:
+                fresh[keys[token]] = results[token]
+            elif ttl > 0:
+                expiring.append((keys[token], results[token], ttl))
+
+        cache.set_many(fresh, self.CACHE_TTL)
+        for key, result, ttl in expiring:
+            cache.set(key, result, ttl)
+
+        return [results[token] for token in tokens]
+
+
+introspection_service = TokenIntrospectionService()
 
 
 def _get_session_or_404(session_id) -> OTPVerificationSession:
@@ -106,12 +206,11 @@ class RequestOTPView(APIView):
         tags=['Auth OTP'],
     )
     def post(self, request):
-        serializer = self.serializer_class(data=request.data)
-        serializer.is_valid(raise_exception=True)
+        validated_data = validate_request_otp(request.data)
 
         session, throttled, retry_after = otp_service.issue_code(
-            serializer.validated_data["address"],
-            serializer.validated_data.get("client_secret", ""),
+            validated_data["address"],
+            validated_data.get("client_secret", ""),
         )
 
         if throttled:
@@ -132,21 +231,23 @@ class SubmitOTPView(APIView):
         tags=['Auth OTP'],
     )
     def post(self, request):
-        serializer = self.serializer_class(data=request.data)
-        serializer.is_valid(raise_exception=True)
+        validated_data = validate_submit_otp(request.data)
 
-        session = _get_session_or_404(serializer.validated_data["session"])
+        session = _get_session_or_404(validated_data["session"])
         _ensure_session_is_active(session)
-        _validate_client_secret(session, serializer.validated_data.get("client_secret"))
+        _validate_client_secret(session, validated_data.get("client_secret"))
 
         if session.attempts >= session.max_attempts:
+            metrics.OTP_MAX_ATTEMPTS.inc()
             raise ValidationError({"otp": "Maximum attempts exceeded. Please request a new OTP."})
 
-        if serializer.validated_data["otp"] != session.otp_code:
+        if validated_data["otp"] != session.otp_code:
             session.register_attempt(False)
+            metrics.OTP_FAILED.inc()
             raise ValidationError({"otp": "OTP is incorrect."})
 
         session.register_attempt(True)
+        metrics.OTP_VERIFIED.inc()
         return Response({"session": str(session.id)}, status=status.HTTP_200_OK)
 
 
@@ -162,10 +263,18 @@ class LoginView(APIView):
         tags=['Auth OTP'],
     )
     def post(self, request):
-        serializer = self.serializer_class(data=request.data)
-        serializer.is_valid(raise_exception=True)
-
-        verification_payload = serializer.validated_data["verification_data"]
+        try:
+            response = self._login(request)
+        except APIException:
+            metrics.LOGIN_REJECTED.inc()
+            raise
+        metrics.LOGIN_SUCCEEDED.inc()
+        return response
+
+    def _login(self, request):
+        validated_data = validate_login(request.data)
+
+        verification_payload = validated_data["verification_data"]
         session = _get_session_or_404(verification_payload["session"])
         _validate_client_secret(session, verification_payload.get("client_secret"))
 
@@ -176,18 +285,34 @@ class LoginView(APIView):
         with transaction.atomic():
             user, _ = User.objects.get_or_create(phone_number=session.address)
             metadata = {
-                "session_data": serializer.validated_data.get("session_data") or {},
-                "referral_code": serializer.validated_data.get("referral_code"),
+                "session_data": validated_data.get("session_data") or {},
+                "referral_code": validated_data.get("referral_code"),
             }
             session.consume(metadata)
 
-        refresh = RefreshToken.for_user(user)
-        return Response(
-            {
-                "user_id": str(user.id),
-                "access": str(refresh.access_token),
-                "refresh": str(refresh),
-            },
-            status=status.HTTP_200_OK,
-        )
+        with section("jwt"):
+            refresh = RefreshToken.for_user(user)
+            tokens = {"access": str(refresh.access_token), "refresh": str(refresh)}
+        return Response({"user_id": str(user.id), **tokens}, status=status.HTTP_200_OK)
+
+
+class TokenIntrospectView(APIView):
+    authentication_classes = []
+    permission_classes = [IsInternalService]
+    serializer_class = TokenIntrospectSerializer
+
+    @swagger_auto_schema(
+        operation_id="AuthIntrospect",
+        operation_description=(
+            "Internal endpoint: verifies a batch of access tokens and returns per-token status and claims "
+            "in request order. Requires the X-Internal-Token header."
+        ),
+        request_body=TokenIntrospectSerializer,
+        responses={200: TokenIntrospectResponseSerializer},
+        tags=['Auth Internal'],
+    )
+    def post(self, request):
+        validated_data = validate_token_introspect(request.data)
 
+        results = introspection_service.introspect(validated_data["tokens"])
+        return Response({"results": results}, status=status.HTTP_200_OK)
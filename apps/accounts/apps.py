@@ -1,6 +1,17 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def _clear_device_profile_cache(**kwargs):
+    # Like ContentType's cache: ids cached before a flush would point at deleted rows.
+    from .models import DeviceProfile
+
+    DeviceProfile.objects.clear_cache()
 
 
 class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.accounts'
+
+    def ready(self):
+        post_migrate.connect(_clear_device_profile_cache, sender=self)
@@ -0,0 +1,218 @@
+import json
+import os
+import subprocess
+import sys
+import time
+import uuid
+from io import BytesIO
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.core.handlers.base import BaseHandler
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from django.urls import reverse
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from apps.accounts.api.auth.serializers import LoginSerializer, RequestOtpSerializer, SubmitOtpSerializer
+from apps.accounts.api.auth.validators import validate_login, validate_request_otp, validate_submit_otp
+from core import metrics
+from core.parsers import ORJSONParser
+from core.renderers import ORJSONRenderer
+
+# Run in a fresh interpreter per settings profile: boot Django the way a worker
+# does (WSGI app + URLconf with all views) and report cost in that process.
+STARTUP_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+from django.urls import get_resolver
+get_resolver().url_patterns
+elapsed = time.perf_counter() - started
+# VmRSS rather than ru_maxrss: the latter is inherited from the forking parent.
+with open("/proc/self/status") as status:
+    rss_kib = int(next(line for line in status if line.startswith("VmRSS:")).split()[1])
+print(json.dumps({"import_ms": elapsed * 1000, "rss_kib": rss_kib, "modules": len(sys.modules)}))
+"""
+
+SESSION_ID = str(uuid.uuid4())
+FAKE_JWT = "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9." + "x" * 180 + ".signature-signature-signature"
+
+# (name, request body, serializer, compiled validator, response body)
+CODEC_CASES = [
+    (
+        "request-otp",
+        b'{"address": "+998901234567", "client_secret": "s3cr3t"}',
+        RequestOtpSerializer,
+        validate_request_otp,
+        {"session": SESSION_ID, "retry_after": 0},
+    ),
+    (
+        "submit-otp",
+        ('{"session": "%s", "otp": "1234"}' % SESSION_ID).encode(),
+        SubmitOtpSerializer,
+        validate_submit_otp,
+        {"session": SESSION_ID},
+    ),
+    (
+        "login",
+        (
+            '{"verification_data": {"session": "%s", "client_secret": "s3cr3t"}, '
+            '"session_data": {"platform": "ANDROID", "device_os": "14", "device_model": "Pixel 8", '
+            '"mac_address": "02:00:00:00:00:00", "lang": "uz", "app_version": "2.4.1", "theme": "dark"}, '
+            '"referral_code": "FRIEND10"}' % SESSION_ID
+        ).encode(),
+        LoginSerializer,
+        validate_login,
+        {"user_id": SESSION_ID, "access": FAKE_JWT, "refresh": FAKE_JWT},
+    ),
+    (
+        "request-otp (400)",
+        b'{"address": "12345"}',
+        RequestOtpSerializer,
+        validate_request_otp,
+        None,
+    ),
+]
+
+
+class _StubViewHandler(BaseHandler):
+    """Handler whose view layer is a constant response, so only middleware is timed."""
+
+    def _get_response(self, request):
+        return HttpResponse(b'{"session": "x", "retry_after": 0}', content_type="application/json")
+
+
+def _serializer_validate(serializer_class):
+    def validate(data):
+        serializer = serializer_class(data=data)
+        serializer.is_valid(raise_exception=True)
+        return serializer.validated_data
+
+    return validate
+
+
+def _request_cycle(parser, validate, renderer, body, response):
+    def run():
+        data = parser.parse(BytesIO(body))
+        try:
+            validate(data)
+            payload = response
+        except ValidationError as exc:
+            payload = exc.detail
+        renderer.render(payload)
+
+    return run
+
+
+class Command(BaseCommand):
+    help = "Micro-benchmarks for the auth request path (single thread, i.e. per gunicorn worker)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scenario", choices=("codecs", "middleware", "startup", "metrics"), default="codecs")
+        parser.add_argument(
+            "--profiles",
+            nargs="+",
+            default=["core.settings", "core.settings_api"],
+            help="Settings modules compared by the startup scenario.",
+        )
+        parser.add_argument("--iterations", type=int, default=20000)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        if options["scenario"] == "startup":
+            self.bench_startup(options["profiles"], options["repeat"])
+            return
+        getattr(self, f"bench_{options['scenario']}")(options["iterations"], options["repeat"])
+
+    def _best_rate(self, func, iterations: int, repeat: int) -> float:
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for _ in range(iterations):
+                func()
+            best = min(best, time.perf_counter() - started)
+        return iterations / best
+
+    def bench_codecs(self, iterations: int, repeat: int):
+        """Parse → validate → render, DRF defaults vs orjson + compiled validators."""
+        self.stdout.write(f"{'shape':<20}{'before req/s':>14}{'after req/s':>14}{'speedup':>10}")
+        for name, body, serializer_class, validator, response in CODEC_CASES:
+            before = _request_cycle(JSONParser(), _serializer_validate(serializer_class), JSONRenderer(), body, response)
+            after = _request_cycle(ORJSONParser(), validator, ORJSONRenderer(), body, response)
+            before_rate = self._best_rate(before, iterations, repeat)
+            after_rate = self._best_rate(after, iterations, repeat)
+            self.stdout.write(
+                f"{name:<20}{before_rate:>14,.0f}{after_rate:>14,.0f}{after_rate / before_rate:>9.1f}x"
+            )
+
+    def bench_middleware(self, iterations: int, repeat: int):
+        """Middleware chain cost for an API path: full stack vs lean routing (view stubbed out)."""
+        wrapper = "core.middleware.BrowserOnlyMiddleware"
+        position = settings.MIDDLEWARE.index(wrapper)
+        full_stack = [
+            *settings.MIDDLEWARE[:position],
+            *settings.BROWSER_MIDDLEWARE,
+            *settings.MIDDLEWARE[position + 1:],
+        ]
+        stacks = {"full stack": full_stack, "lean": settings.MIDDLEWARE}
+        factory = RequestFactory()
+        url = reverse("auth-request-otp")
+
+        timings = {}
+        for label, middleware in stacks.items():
+            handler = _StubViewHandler()
+            with override_settings(MIDDLEWARE=middleware):
+                handler.load_middleware()
+            timings[label] = lambda handler=handler: handler.get_response(
+                factory.post(url, b"{}", content_type="application/json")
+            )
+
+        rates = {label: 0.0 for label in stacks}
+        with override_settings(ALLOWED_HOSTS=["testserver"]):
+            for _ in range(repeat):
+                # Interleave the stacks so CPU frequency drift hits both equally.
+                for label, run in timings.items():
+                    rates[label] = max(rates[label], self._best_rate(run, iterations, 1))
+
+        for label, rate in rates.items():
+            self.stdout.write(f"{label:<12}{rate:>10,.0f} req/s{1e6 / rate:>10.1f} us/req")
+        saved = 1e6 / rates["full stack"] - 1e6 / rates["lean"]
+        self.stdout.write(f"saved per request: {saved:.1f} us")
+
+    def bench_startup(self, profiles: list[str], repeat: int):
+        """Worker boot cost per settings profile: import time, resident memory and loaded modules (Linux)."""
+        self.stdout.write(f"{'profile':<24}{'import ms':>12}{'RSS MiB':>10}{'modules':>10}")
+        for profile in profiles:
+            env = {**os.environ, "DJANGO_SETTINGS_MODULE": profile}
+            runs = []
+            for _ in range(repeat):
+                output = subprocess.run(
+                    [sys.executable, "-c", STARTUP_PROBE],
+                    env=env,
+                    cwd=settings.BASE_DIR,
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                ).stdout
+                runs.append(json.loads(output.strip().splitlines()[-1]))
+            best = min(runs, key=lambda run: run["import_ms"])
+            self.stdout.write(
+                f"{profile:<24}{best['import_ms']:>12.1f}{best['rss_kib'] / 1024:>10.1f}{best['modules']:>10}"
+            )
+
+    def bench_metrics(self, iterations: int, repeat: int):
+        """Cost of one metric update on the request path (shard already open)."""
+        histogram = metrics.HTTP_REQUEST_DURATION.labels(view="auth-request-otp")
+        updates = {
+            "counter.inc": metrics.OTP_ISSUED.inc,
+            "histogram.observe": lambda: histogram.observe(0.012),
+            "labels().inc": lambda: metrics.HTTP_RESPONSES.labels(view="auth-request-otp", status="2xx").inc(),
+        }
+        for name, update in updates.items():
+            update()
+            rate = self._best_rate(update, iterations, repeat)
+            self.stdout.write(f"{name:<20}{1e9 / rate:>10.0f} ns/op")
@@ -0,0 +1,392 @@
+import csv
+import io
+import json
+import random
+import statistics
+import time
+import uuid
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+
+from apps.accounts.api.auth.views import (
+    LoginView,
+    OTPWorkflowService,
+    RequestOTPView,
+    SubmitOTPView,
+    _get_session_or_404,
+    otp_service,
+)
+from apps.accounts.models import DeviceProfile, OTPVerificationSession, User
+
+SEED_CHUNK = 50_000
+SESSIONS_PER_ADDRESS = 3
+SESSIONS_PER_USER = 4
+PLATFORMS = ("ANDROID", "IOS")
+APP_VERSIONS = ("2.3.0", "2.4.0", "2.4.1")
+BENCH_OTP = "1234"
+EXPLAIN_PREFIXES = ("SELECT", "UPDATE", "INSERT", "DELETE")
+
+
+class _NullSMS:
+    def send_otp(self, phone_number: str, otp_code: str) -> None:
+        pass
+
+    def ping(self) -> None:
+        pass
+
+
+def address_for(index: int) -> str:
+    return f"+9989{index:08d}"
+
+
+def _session_row(address: str, now, profile_ids: list[int]) -> dict:
+    """One historical OTP session; the state mix follows production (mostly consumed, few live)."""
+    created_at = now - timedelta(days=365 * random.random() ** 1.5)
+    row = {
+        "id": uuid.uuid4(),
+        "address": address,
+        "client_secret": "",
+        "otp_code": f"{random.randrange(10_000):04d}",
+        "expires_at": created_at + OTPVerificationSession.OTP_TTL,
+        "last_sent_at": created_at,
+        "attempts": 0,
+        "max_attempts": OTPVerificationSession.MAX_ATTEMPTS,
+        "is_verified": False,
+        "verified_at": None,
+        "consumed_at": None,
+        "session_data": {},
+        "created_at": created_at,
+        "updated_at": created_at,
+    }
+    state = random.random()
+    if state < 0.65:
+        row.update(
+            is_verified=True,
+            verified_at=created_at + timedelta(seconds=30),
+            consumed_at=created_at + timedelta(seconds=40),
+            device_profile_id=random.choice(profile_ids),
+            referral_code=None if random.random() < 0.9 else f"REF{random.randrange(1000)}",
+        )
+    elif state < 0.90:
+        row["attempts"] = random.randrange(OTPVerificationSession.MAX_ATTEMPTS + 1)
+    elif state < 0.98:
+        row.update(is_verified=True, verified_at=created_at + timedelta(seconds=30))
+    else:
+        row.update(created_at=now, last_sent_at=now, updated_at=now, expires_at=now + OTPVerificationSession.OTP_TTL)
+    return row
+
+
+def _user_row(index: int, now) -> dict:
+    return {
+        "id": uuid.uuid4(),
+        "password": "!",
+        "phone_number": address_for(index),
+        "is_active": random.random() > 0.01,
+        "date_joined": now - timedelta(days=730 * random.random()),
+    }
+
+
+def _copy_value(value) -> str | None:
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def bulk_load(model, rows: list[dict]) -> None:
+    """COPY on PostgreSQL, executemany elsewhere; both bypass the per-object ORM overhead."""
+    fields = model._meta.concrete_fields
+    table = connection.ops.quote_name(model._meta.db_table)
+    columns = ", ".join(connection.ops.quote_name(field.column) for field in fields)
+
+    def raw(row, field):
+        return row[field.attname] if field.attname in row else field.get_default()
+
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for row in rows:
+                writer.writerow(["\\N" if (value := _copy_value(raw(row, field))) is None else value for field in fields])
+            buffer.seek(0)
+            sql = f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+            raw_cursor = cursor.cursor
+            if hasattr(raw_cursor, "copy_expert"):
+                raw_cursor.copy_expert(sql, buffer)
+            else:
+                with raw_cursor.copy(sql) as copy:
+                    copy.write(buffer.getvalue())
+        else:
+            placeholders = ", ".join(["%s"] * len(fields))
+            cursor.executemany(
+                f"INSERT INTO {table} ({columns}) VALUES ({placeholders})",
+                [[field.get_db_prep_save(raw(row, field), connection) for field in fields] for row in rows],
+            )
+
+
+def seed(target_sessions: int, stdout=None) -> None:
+    """Grow the tables to ``target_sessions`` OTP sessions (and a proportional user count)."""
+    now = timezone.now()
+    address_pool = max(1, target_sessions // SESSIONS_PER_ADDRESS)
+
+    users = User.objects.count()
+    target_users = target_sessions // SESSIONS_PER_USER
+    while users < target_users:
+        batch = min(SEED_CHUNK, target_users - users)
+        bulk_load(User, [_user_row(index, now) for index in range(users, users + batch)])
+        users += batch
+
+    profile_ids = [
+        DeviceProfile.objects.intern({"platform": platform, "app_version": version, "lang": "uz"})
+        for platform in PLATFORMS
+        for version in APP_VERSIONS
+    ]
+    sessions = OTPVerificationSession.objects.count()
+    while sessions < target_sessions:
+        batch = min(SEED_CHUNK, target_sessions - sessions)
+        # Squared uniform: a minority of numbers request most codes.
+        rows = [
+            _session_row(address_for(int(address_pool * random.random() ** 2)), now, profile_ids)
+            for _ in range(batch)
+        ]
+        bulk_load(OTPVerificationSession, rows)
+        sessions += batch
+        if stdout:
+            stdout.write(f"  seeded {sessions:,}/{target_sessions:,} sessions")
+
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {User._meta.db_table}, {OTPVerificationSession._meta.db_table}")
+
+
+def _sample_ids(count: int, per_seek: int = 10) -> list:
+    """
+    Random session ids without ``ORDER BY random()`` over the whole table: ids are uuid4, so a primary-key
+    index seek from a random UUID lands on a uniformly random row, and the next ``per_seek`` ids are too.
+    """
+    ids = {}
+    for _ in range(2 * -(-count // per_seek)):
+        start = uuid.UUID(int=random.getrandbits(128))
+        page = OTPVerificationSession.objects.filter(id__gte=start).order_by("id").values_list("id", flat=True)
+        ids.update(dict.fromkeys(page[:per_seek]))
+        if len(ids) >= count:
+            break
+    return list(ids)[:count]
+
+
+def _prime_session(session_id, **state) -> None:
+    now = timezone.now()
+    defaults = {
+        "expires_at": now + OTPVerificationSession.OTP_TTL,
+        "consumed_at": None,
+        "client_secret": "",
+        "otp_code": BENCH_OTP,
+        "attempts": 0,
+        "is_verified": False,
+    }
+    OTPVerificationSession.objects.filter(id=session_id).update(**{**defaults, **state})
+
+
+def build_operations(address_pool: int, session_ids: list) -> dict:
+    """name -> (prepare, run); ``prepare`` is untimed and both run inside a rolled-back transaction."""
+    service = OTPWorkflowService(sms_client=_NullSMS())
+    factory = APIRequestFactory()
+    views = {
+        "request-otp": RequestOTPView.as_view(),
+        "submit-otp": SubmitOTPView.as_view(),
+        "login": LoginView.as_view(),
+    }
+
+    def address():
+        return address_for(int(address_pool * random.random() ** 2))
+
+    def session_id():
+        return random.choice(session_ids)
+
+    def fetch(session_id):
+        return OTPVerificationSession.objects.get(id=session_id)
+
+    def unverified_session():
+        sid = session_id()
+        _prime_session(sid)
+        return sid
+
+    def verified_session():
+        sid = session_id()
+        _prime_session(sid, is_verified=True)
+        return sid
+
+    def call_view(name, body):
+        response = views[name](factory.post(f"/api/v1/auth/{name}/", body, format="json"))
+        response.render()
+        return response
+
+    return {
+        "get_active_session": (address, service._get_active_session),
+        "get_session_or_404": (session_id, _get_session_or_404),
+        "issue_code": (address, service.issue_code),
+        "register_attempt_failed": (lambda: fetch(session_id()), lambda session: session.register_attempt(False)),
+        "register_attempt_success": (lambda: fetch(session_id()), lambda session: session.register_attempt(True)),
+        "consume": (
+            lambda: fetch(session_id()),
+            lambda session: session.consume({"session_data": {"platform": "ANDROID", "app_version": "2.4.1", "lang": "uz"}}),
+        ),
+        "view_request_otp": (address, lambda phone: call_view("request-otp", {"address": phone})),
+        "view_submit_otp": (
+            unverified_session,
+            lambda sid: call_view("submit-otp", {"session": str(sid), "otp": BENCH_OTP}),
+        ),
+        "view_login": (verified_session, lambda sid: call_view("login", {"verification_data": {"session": str(sid)}})),
+    }
+
+
+def _rolled_back(func):
+    with transaction.atomic():
+        try:
+            return func()
+        finally:
+            transaction.set_rollback(True)
+
+
+def explain(prepare, run) -> str:
+    """Run the operation once to capture its SQL, undo it, then replay each statement under EXPLAIN in order."""
+    prefix = "EXPLAIN (ANALYZE, BUFFERS) " if connection.vendor == "postgresql" else "EXPLAIN QUERY PLAN "
+
+    def capture_and_explain():
+        fixture = prepare()
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as captured:
+                run(fixture)
+            transaction.set_rollback(True)
+
+        sections = []
+        for query in captured.captured_queries:
+            sql = query["sql"]
+            if not sql.lstrip().upper().startswith(EXPLAIN_PREFIXES):
+                continue
+            try:
+                # EXPLAIN ANALYZE executes the statement, so later ones see the same state as the real run.
+                with transaction.atomic(), connection.cursor() as cursor:
+                    cursor.execute(prefix + sql)
+                    plan = "\n".join(" | ".join(str(column) for column in row) for row in cursor.fetchall())
+            except DatabaseError as exc:
+                plan = f"(not explainable: {exc})"
+            sections.append(f"{sql}\n{plan}")
+        return "\n\n".join(sections)
+
+    return _rolled_back(capture_and_explain)
+
+
+def run_operations(operations: dict, iterations: int, explain_dir: Path | None = None) -> dict:
+    results = {}
+    for name, (prepare, run) in operations.items():
+        timings, queries = [], 0
+        for iteration in range(iterations):
+            def timed():
+                fixture = prepare()
+                with CaptureQueriesContext(connection) as captured:
+                    started = time.perf_counter()
+                    run(fixture)
+                    elapsed = time.perf_counter() - started
+                return elapsed, len(captured.captured_queries)
+
+            elapsed, count = _rolled_back(timed)
+            timings.append(elapsed * 1000)
+            queries = max(queries, count)
+
+        timings.sort()
+        results[name] = {
+            "median_ms": round(statistics.median(timings), 3),
+            "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3),
+            "queries": queries,
+        }
+        if explain_dir is not None:
+            explain_dir.mkdir(parents=True, exist_ok=True)
+            (explain_dir / f"{name}.txt").write_text(explain(prepare, run))
+    return results
+
+
+def find_regressions(results: dict, baseline: dict, tolerance: float, floor_ms: float) -> list[str]:
+    """Slower than baseline by more than ``tolerance`` (and ``floor_ms``), or more queries."""
+    regressions = []
+    for scale, operations in results.items():
+        for name, current in operations.items():
+            before = baseline.get(scale, {}).get(name)
+            if before is None:
+                continue
+            if current["queries"] > before["queries"]:
+                regressions.append(f"{scale} {name}: {before['queries']} -> {current['queries']} queries")
+            limit = max(before["median_ms"] * (1 + tolerance), before["median_ms"] + floor_ms)
+            if current["median_ms"] > limit:
+                regressions.append(f"{scale} {name}: median {before['median_ms']} -> {current['median_ms']} ms")
+    return regressions
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway test database with OTP sessions/users at the given sizes, time the OTP service and view "
+        "operations, capture EXPLAIN plans and fail on regressions against a stored baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, nargs="+", default=[10_000], help="OTP session counts, e.g. 10000 1000000.")
+        parser.add_argument("--iterations", type=int, default=200)
+        parser.add_argument("--keepdb", action="store_true", help="Keep (and reuse) the seeded test database.")
+        parser.add_argument("--baseline", default=str(Path(settings.BASE_DIR) / "benchmarks" / "otp_orm_baseline.json"))
+        parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline.")
+        parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown of the median.")
+        parser.add_argument("--floor-ms", type=float, default=0.2, help="Ignore slowdowns smaller than this.")
+        parser.add_argument("--explain-dir", help="Write one EXPLAIN file per scale and operation here.")
+        parser.add_argument("--seed", type=int, default=24)
+
+    def handle(self, *args, **options):
+        baseline_path = Path(options["baseline"])
+        if not options["save_baseline"] and not baseline_path.exists():
+            # Without a baseline there is nothing to compare against, and a silent pass would hide regressions.
+            raise CommandError(f"No baseline at {baseline_path}; run with --save-baseline on this machine first.")
+        random.seed(options["seed"])
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False, keepdb=options["keepdb"])
+        otp_service_client, otp_service.sms_client = otp_service.sms_client, _NullSMS()
+        try:
+            results = {}
+            for rows in sorted(options["rows"]):
+                self.stdout.write(f"Seeding {rows:,} sessions on {connection.vendor}...")
+                seed(rows, self.stdout)
+                operations = build_operations(max(1, rows // SESSIONS_PER_ADDRESS), _sample_ids(1000))
+                explain_dir = Path(options["explain_dir"]) / str(rows) if options["explain_dir"] else None
+                results[str(rows)] = run_operations(operations, options["iterations"], explain_dir)
+                self._print(rows, results[str(rows)])
+        finally:
+            otp_service.sms_client = otp_service_client
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options["keepdb"])
+
+        if options["save_baseline"]:
+            baseline_path.parent.mkdir(parents=True, exist_ok=True)
+            baseline_path.write_text(json.dumps(results, indent=2))
+            self.stdout.write(f"Baseline written to {baseline_path}")
+            return
+
+        regressions = find_regressions(
+            results, json.loads(baseline_path.read_text()), options["tolerance"], options["floor_ms"]
+        )
+        if regressions:
+            raise CommandError("Regressions against baseline:\n" + "\n".join(regressions))
+        self.stdout.write(self.style.SUCCESS("No regressions against baseline."))
+
+    def _print(self, rows: int, results: dict) -> None:
+        self.stdout.write(f"{'operation @ ' + format(rows, ','):<34}{'median ms':>11}{'p95 ms':>10}{'queries':>9}")
+        for name, stats in results.items():
+            self.stdout.write(f"{name:<34}{stats['median_ms']:>11.3f}{stats['p95_ms']:>10.3f}{stats['queries']:>9}")
@@ -0,0 +1,31 @@
+import gzip
+import os
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.openapi import render_schema
+
+
+class Command(BaseCommand):
+    help = "Pre-generate the OpenAPI documents (plus .gz variants) served by /api/v1/docs.json and docs.yaml."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output-dir", default=str(settings.OPENAPI_SCHEMA_DIR))
+
+    def handle(self, *args, **options):
+        output_dir = Path(options["output_dir"])
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        for name, body in render_schema().items():
+            self._write(output_dir / name, body)
+            self._write(output_dir / f"{name}.gz", gzip.compress(body, compresslevel=9, mtime=0))
+            self.stdout.write(f"{output_dir / name}: {len(body)} bytes")
+
+    @staticmethod
+    def _write(path: Path, content: bytes) -> None:
+        # Running workers may read these at any moment; never expose a partial file.
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        tmp_path.write_bytes(content)
+        os.replace(tmp_path, path)
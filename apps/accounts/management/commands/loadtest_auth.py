@@ -0,0 +1,321 @@
+import http.client
+import json
+import random
+import subprocess
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from apps.accounts.api.auth.views import OTPWorkflowService
+
+PLATFORMS = ("ANDROID", "IOS")
+APP_VERSIONS = ("2.3.0", "2.4.0", "2.4.1")
+DEFAULT_CONCURRENCY = 16
+
+
+class SMSSink:
+    """Local HTTP endpoint standing in for the SMS provider (see ``SinkSMSService``)."""
+
+    def __init__(self, host: str, port: int):
+        self.codes: dict[str, str] = {}
+        self.arrived = threading.Condition()
+        sink = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with sink.arrived:
+                    sink.codes[payload["phone_number"]] = payload["otp_code"]
+                    sink.arrived.notify_all()
+                self.send_response(204)
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def wait_for_code(self, phone_number: str, timeout: float = 5.0) -> str:
+        with self.arrived:
+            if not self.arrived.wait_for(lambda: phone_number in self.codes, timeout):
+                raise TimeoutError(f"No OTP reached the sink for {phone_number}")
+            return self.codes.pop(phone_number)
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))]
+
+
+class LoadClient:
+    """Keep-alive HTTP client, one connection per worker thread."""
+
+    def __init__(self, base_url: str, timeout: float):
+        parts = urlsplit(base_url)
+        self.connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self.netloc = parts.netloc
+        self.timeout = timeout
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    def _connection(self):
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = self.local.connection = self.connection_class(self.netloc, timeout=self.timeout)
+        return connection
+
+    def call(self, endpoint: str, method: str, path: str, body=None, headers=None) -> tuple[int, dict]:
+        data = json.dumps(body).encode() if body is not None else None
+        request_headers = {"Content-Type": "application/json", **(headers or {})}
+        started = time.perf_counter()
+        try:
+            connection = self._connection()
+            connection.request(method, path, body=data, headers=request_headers)
+            response = connection.getresponse()
+            payload = response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            self.local.connection = None
+            status, payload = 0, b""
+        elapsed = time.perf_counter() - started
+
+        with self.lock:
+            self.latencies[endpoint].append(elapsed)
+            self.statuses[endpoint][str(status)] += 1
+            if not 200 <= status < 300:
+                self.errors[endpoint] += 1
+        try:
+            return status, json.loads(payload) if payload else {}
+        except ValueError:
+            return status, {}
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive full request-otp -> submit-otp -> login flows (or replay recorded JSONL traffic) against a running "
+        "server and report throughput and p50/p95/p99 latency per endpoint."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://127.0.0.1:8001")
+        parser.add_argument("--flows", type=int, default=200, help="Synthetic flows to run (ignored with --replay).")
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            help=f"Parallel flows; defaults to {DEFAULT_CONCURRENCY} with --sms-sink and to 1 without it.",
+        )
+        parser.add_argument(
+            "--sms-sink",
+            metavar="HOST:PORT",
+            help=(
+                "Serve the SMS sink here and use a fresh phone number per flow. The server must run with "
+                "SMS_SINK_URL=http://HOST:PORT/. Without it every flow uses TEST_PHONE/TEST_OTP, which share one "
+                "OTP session, so only --concurrency 1 is meaningful."
+            ),
+        )
+        parser.add_argument("--replay", help="JSONL file of recorded flows/requests (see --save-flows for the format).")
+        parser.add_argument("--speed", type=float, default=1.0, help="Replay time compression (2 = twice as fast).")
+        parser.add_argument("--save-flows", help="Write the synthetic flows as replayable JSONL.")
+        parser.add_argument("--output", help="Write machine-readable results (JSON) here.")
+        parser.add_argument("--label", default="", help="Stored in the results file, e.g. the release tag.")
+        parser.add_argument("--compare", help="Earlier results file to print deltas against.")
+        parser.add_argument("--timeout", type=float, default=10.0)
+
+    def handle(self, *args, **options):
+        if options["concurrency"] is None:
+            options["concurrency"] = DEFAULT_CONCURRENCY if options["sms_sink"] else 1
+        if not options["sms_sink"] and options["concurrency"] > 1:
+            raise CommandError("TEST_PHONE flows share a single OTP session; use --concurrency 1 or --sms-sink.")
+
+        records = self._load_records(options)
+        if options["save_flows"]:
+            Path(options["save_flows"]).write_text("".join(json.dumps(record) + "\n" for record in records))
+
+        self.client = LoadClient(options["base_url"], options["timeout"])
+        self.paths = {name: reverse(f"auth-{name}") for name in ("request-otp", "submit-otp", "login")}
+
+        if options["sms_sink"]:
+            host, _, port = options["sms_sink"].rpartition(":")
+            with SMSSink(host or "127.0.0.1", int(port)) as self.sink:
+                duration = self._run(records, options)
+        else:
+            self.sink = None
+            duration = self._run(records, options)
+
+        results = self._results(duration, options)
+        self._print(results)
+        if options["compare"]:
+            self._print_comparison(json.loads(Path(options["compare"]).read_text()), results)
+        if options["output"]:
+            Path(options["output"]).write_text(json.dumps(results, indent=2))
+            self.stdout.write(f"Results written to {options['output']}")
+
+    def _load_records(self, options) -> list[dict]:
+        if options["replay"]:
+            with open(options["replay"]) as replay:
+                return sorted((json.loads(line) for line in replay if line.strip()), key=lambda record: record.get("at", 0))
+        return [
+            {
+                "at": 0,
+                "flow": {
+                    "address": self._phone_number(options),
+                    "client_secret": f"lt-{index}",
+                    "session_data": {
+                        "platform": random.choice(PLATFORMS),
+                        "app_version": random.choice(APP_VERSIONS),
+                        "lang": "uz",
+                    },
+                },
+            }
+            for index in range(options["flows"])
+        ]
+
+    @staticmethod
+    def _phone_number(options) -> str:
+        if not options["sms_sink"]:
+            return OTPWorkflowService.TEST_PHONE
+        return f"+99890{random.randrange(10 ** 7):07d}"
+
+    def _run(self, records: list[dict], options) -> float:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as executor:
+            futures, flow_futures = [], []
+            for record in records:
+                # Open-loop replay: start each record at its recorded offset.
+                delay = record.get("at", 0) / options["speed"] - (time.perf_counter() - started)
+                if delay > 0:
+                    time.sleep(delay)
+                if "flow" in record:
+                    flow_futures.append(executor.submit(self._run_flow, record["flow"]))
+                    futures.append(flow_futures[-1])
+                else:
+                    request = record["request"]
+                    futures.append(executor.submit(
+                        self.client.call,
+                        request["path"],
+                        request.get("method", "POST"),
+                        request["path"],
+                        request.get("body"),
+                        request.get("headers"),
+                    ))
+            wait(futures)
+        for future in futures:
+            future.result()
+        # Outcomes come back through the futures, so worker threads never share a counter.
+        self.flow_results = Counter(future.result() for future in flow_futures)
+        return time.perf_counter() - started
+
+    def _run_flow(self, flow: dict) -> str:
+        """Run one request-otp -> submit-otp -> login flow and return its outcome."""
+        address = flow["address"] if self.sink else OTPWorkflowService.TEST_PHONE
+        client_secret = flow.get("client_secret", "")
+
+        status, body = self.client.call(
+            "request-otp", "POST", self.paths["request-otp"], {"address": address, "client_secret": client_secret}
+        )
+        if status != 200:
+            return "failed_request_otp"
+        session = body["session"]
+
+        try:
+            otp = self.sink.wait_for_code(address) if self.sink else OTPWorkflowService.TEST_OTP
+        except TimeoutError:
+            return "failed_sms"
+
+        status, _ = self.client.call(
+            "submit-otp",
+            "POST",
+            self.paths["submit-otp"],
+            {"session": session, "otp": otp, "client_secret": client_secret},
+        )
+        if status != 200:
+            return "failed_submit_otp"
+
+        login = {"verification_data": {"session": session, "client_secret": client_secret}}
+        for field in ("session_data", "referral_code"):
+            if flow.get(field) is not None:
+                login[field] = flow[field]
+        status, _ = self.client.call("login", "POST", self.paths["login"], login)
+        return "completed" if status == 200 else "failed_login"
+
+    def _results(self, duration: float, options) -> dict:
+        endpoints = {}
+        for endpoint, latencies in sorted(self.client.latencies.items()):
+            ordered = sorted(latencies)
+            endpoints[endpoint] = {
+                "requests": len(ordered),
+                "errors": self.client.errors[endpoint],
+                "statuses": dict(self.client.statuses[endpoint]),
+                "throughput_rps": round(len(ordered) / duration, 2),
+                "p50_ms": round(percentile(ordered, 0.50) * 1000, 2),
+                "p95_ms": round(percentile(ordered, 0.95) * 1000, 2),
+                "p99_ms": round(percentile(ordered, 0.99) * 1000, 2),
+                "max_ms": round(ordered[-1] * 1000, 2),
+            }
+        return {
+            "label": options["label"],
+            "revision": self._revision(),
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "base_url": options["base_url"],
+            "concurrency": options["concurrency"],
+            "duration_s": round(duration, 3),
+            "flows": dict(self.flow_results),
+            "endpoints": endpoints,
+        }
+
+    @staticmethod
+    def _revision() -> str:
+        try:
+            return subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"], cwd=settings.BASE_DIR, capture_output=True, text=True
+            ).stdout.strip()
+        except OSError:
+            return ""
+
+    def _print(self, results: dict) -> None:
+        self.stdout.write(
+            f"{'endpoint':<28}{'requests':>10}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+        )
+        for endpoint, stats in results["endpoints"].items():
+            self.stdout.write(
+                f"{endpoint:<28}{stats['requests']:>10}{stats['errors']:>8}{stats['throughput_rps']:>10.1f}"
+                f"{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}{stats['p99_ms']:>10.1f}"
+            )
+        flows = ", ".join(f"{outcome}={count}" for outcome, count in sorted(results["flows"].items()))
+        self.stdout.write(f"flows: {flows or 'none'} in {results['duration_s']:.1f}s")
+
+    def _print_comparison(self, baseline: dict, results: dict) -> None:
+        self.stdout.write(f"\nvs {baseline.get('label') or baseline.get('revision') or 'baseline'}:")
+        for endpoint, stats in results["endpoints"].items():
+            before = baseline["endpoints"].get(endpoint)
+            if not before:
+                continue
+            deltas = [
+                f"{metric} {(stats[metric] - before[metric]) / before[metric] * 100:+.1f}%"
+                for metric in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms")
+                if before[metric]
+            ]
+            self.stdout.write(f"{endpoint:<28}" + "  ".join(deltas))
@@ -0,0 +1,89 @@
+import collections
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.profiling import DUMP_NAME, DUMP_SUFFIX, TOKEN_HEADER, TOKEN_MAX_AGE, issue_token
+
+
+def read_dump(path: Path) -> collections.Counter:
+    stacks = collections.Counter()
+    for line in path.read_text().splitlines():
+        stack, _, count = line.rpartition(" ")
+        if stack and count.isdigit():
+            stacks[stack] += int(count)
+    return stacks
+
+
+class Command(BaseCommand):
+    help = "Merge the profiler's folded-stack dumps and print the hottest code paths (or issue a profiling token)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dir", default=str(settings.PROFILE_DIR))
+        parser.add_argument("--view", help="Only dumps of this URL name (e.g. auth-login).")
+        parser.add_argument("--min-ms", type=int, default=0, help="Only requests at least this slow.")
+        parser.add_argument("--top", type=int, default=15)
+        parser.add_argument("--depth", type=int, default=6, help="Innermost frames shown per hot path.")
+        parser.add_argument("--output", help="Write the merged folded stacks here (flamegraph.pl / speedscope input).")
+        parser.add_argument(
+            "--token",
+            action="store_true",
+            help=f"Print an {TOKEN_HEADER} header value (valid {TOKEN_MAX_AGE // 60} min) and exit.",
+        )
+
+    def handle(self, *args, **options):
+        if options["token"]:
+            self.stdout.write(f"{TOKEN_HEADER}: {issue_token()}")
+            return
+
+        dumps = []
+        for path in sorted(Path(options["dir"]).glob(f"*{DUMP_SUFFIX}")):
+            match = DUMP_NAME.match(path.name)
+            if match is None:
+                continue
+            if options["view"] and match["view"] != options["view"]:
+                continue
+            if int(match["duration"]) < options["min_ms"]:
+                continue
+            dumps.append((match["view"], int(match["duration"]), read_dump(path)))
+        if not dumps:
+            raise CommandError(f"No matching profile dumps in {options['dir']}.")
+
+        merged = collections.Counter()
+        per_view = collections.defaultdict(lambda: [0, 0, 0])
+        for view, duration, stacks in dumps:
+            merged.update(stacks)
+            totals = per_view[view]
+            totals[0] += 1
+            totals[1] += duration
+            totals[2] += sum(stacks.values())
+        total_samples = sum(merged.values()) or 1
+
+        self.stdout.write(f"{'view':<32}{'requests':>10}{'avg ms':>10}{'samples':>10}")
+        for view, (requests, duration, samples) in sorted(per_view.items()):
+            self.stdout.write(f"{view:<32}{requests:>10}{duration / requests:>10.1f}{samples:>10}")
+
+        own, inclusive = collections.Counter(), collections.Counter()
+        paths = collections.Counter()
+        for stack, count in merged.items():
+            frames = stack.split(";")
+            own[frames[-1]] += count
+            for frame in set(frames):
+                inclusive[frame] += count
+            paths[";".join(frames[-options["depth"]:])] += count
+
+        self._table("Hottest functions (own samples)", own, total_samples, options["top"])
+        self._table("Hottest functions (including callees)", inclusive, total_samples, options["top"])
+        self.stdout.write(f"\nHottest paths (innermost {options['depth']} frames)")
+        for path, count in paths.most_common(options["top"]):
+            self.stdout.write(f"{100 * count / total_samples:6.1f}%  " + "\n         -> ".join(path.split(";")))
+
+        if options["output"]:
+            Path(options["output"]).write_text("".join(f"{stack} {count}\n" for stack, count in merged.items()))
+            self.stdout.write(f"\nMerged stacks written to {options['output']}")
+
+    def _table(self, title: str, counts: collections.Counter, total: int, top: int) -> None:
+        self.stdout.write(f"\n{title}")
+        for frame, count in counts.most_common(top):
+            self.stdout.write(f"{100 * count / total:6.1f}%  {frame}")
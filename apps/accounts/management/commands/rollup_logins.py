@@ -0,0 +1,38 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from apps.accounts import rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Add newly consumed OTP sessions to the hourly login rollups (platform, app version, referral code). "
+        "Run it every few minutes; the first run backfills from the oldest login."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--lag-minutes",
+            type=int,
+            default=int(rollups.DEFAULT_LAG.total_seconds() // 60),
+            help="Leave the most recent minutes for the next run, so in-flight logins commit first.",
+        )
+        parser.add_argument(
+            "--window-hours",
+            type=int,
+            default=int(rollups.DEFAULT_WINDOW.total_seconds() // 3600),
+            help="Consumed-at range aggregated per transaction.",
+        )
+        parser.add_argument("--rebuild", action="store_true", help="Drop the rollups and recompute them from scratch.")
+
+    def handle(self, *args, **options):
+        if options["rebuild"]:
+            rollups.rebuild()
+            self.stdout.write("Rollups cleared; recomputing from the first login.")
+        added = rollups.advance(
+            lag=timedelta(minutes=options["lag_minutes"]),
+            window=timedelta(hours=options["window_hours"]),
+            stdout=self.stdout if options["verbosity"] > 1 else None,
+        )
+        self.stdout.write(f"Added {added} logins to the rollups.")
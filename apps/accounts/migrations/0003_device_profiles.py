@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_admin_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeviceProfile',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('fingerprint', models.CharField(editable=False, max_length=40, unique=True)),
+                ('platform', models.TextField(blank=True, default='')),
+                ('device_os', models.TextField(blank=True, default='')),
+                ('device_model', models.TextField(blank=True, default='')),
+                ('app_version', models.TextField(blank=True, default='')),
+                ('lang', models.TextField(blank=True, default='')),
+                ('theme', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='otpverificationsession',
+            name='mac_address',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='otpverificationsession',
+            name='referral_code',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='otpverificationsession',
+            name='device_profile',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.deviceprofile'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_device_profiles'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LoginRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField()),
+                ('platform', models.TextField(blank=True, default='')),
+                ('app_version', models.TextField(blank=True, default='')),
+                ('referral_code', models.TextField(blank=True, default='')),
+                ('logins', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ('-hour',),
+            },
+        ),
+        migrations.CreateModel(
+            name='RollupWatermark',
+            fields=[
+                ('name', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('position', models.DateTimeField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='loginrollup',
+            constraint=models.UniqueConstraint(fields=('hour', 'platform', 'app_version', 'referral_code'), name='accounts_login_rollup_unique'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:44
+
+from django.db import migrations, models
+
+from core.db_operations import AddIndexOnline
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('accounts', '0004_login_rollups'),
+    ]
+
+    operations = [
+        AddIndexOnline(
+            model_name='otpverificationsession',
+            index=models.Index(fields=['consumed_at'], name='accounts_otp_consumed_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:03
+
+from django.db import migrations, models
+
+from core.db_operations import AddIndexOnline
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('accounts', '0005_otp_consumed_index'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        AddIndexOnline(
+            model_name='user',
+            index=models.Index(fields=['first_name'], name='accounts_user_first_name_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        AddIndexOnline(
+            model_name='user',
+            index=models.Index(fields=['last_name'], name='accounts_user_last_name_idx', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
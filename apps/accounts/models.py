@@ -1,10 +1,11 @@
+import hashlib
 import uuid
 from datetime import timedelta
 
 from django.contrib.auth.base_user import AbstractBaseUser, BaseUserManager
 from django.contrib.auth.models import PermissionsMixin
 from django.core.validators import RegexValidator
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 
 
@@ -67,11 +68,75 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     class Meta:
         ordering = ("date_joined",)
+        indexes = [
+            # Admin keyset pagination and date range filter.
+            models.Index(fields=["date_joined", "id"], name="accounts_user_joined_id_idx"),
+            # Admin name search (startswith).
+            models.Index(fields=["first_name"], name="accounts_user_first_name_idx", opclasses=["varchar_pattern_ops"]),
+            models.Index(fields=["last_name"], name="accounts_user_last_name_idx", opclasses=["varchar_pattern_ops"]),
+        ]
 
     def __str__(self):
         return self.phone_number
 
 
+class DeviceProfileManager(models.Manager):
+    # Distinct profiles number in the hundreds; the cap only guards against abuse.
+    CACHE_SIZE = 10_000
+
+    def __init__(self):
+        super().__init__()
+        self._ids: dict[tuple, int] = {}
+
+    def clear_cache(self) -> None:
+        self._ids.clear()
+
+    def intern(self, session_data: dict) -> int | None:
+        """Id of the profile matching ``session_data``, created on first sight; ``None`` if it is empty."""
+        values = tuple(str(session_data.get(field) or "") for field in DeviceProfile.PROFILE_FIELDS)
+        if not any(values):
+            return None
+        profile_id = self._ids.get(values)
+        if profile_id is None:
+            profile, _ = self.get_or_create(
+                fingerprint=DeviceProfile.fingerprint_for(values),
+                defaults=dict(zip(DeviceProfile.PROFILE_FIELDS, values)),
+            )
+            profile_id = profile.id
+            if len(self._ids) < self.CACHE_SIZE:
+                # A profile created in a transaction that rolls back must not stay cached.
+                transaction.on_commit(lambda: self._ids.setdefault(values, profile_id), using=self.db)
+        return profile_id
+
+
+class DeviceProfile(models.Model):
+    """One row per distinct device/OS/app combination; login sessions reference it by id."""
+
+    PROFILE_FIELDS = ("platform", "device_os", "device_model", "app_version", "lang", "theme")
+
+    id = models.AutoField(primary_key=True)
+    fingerprint = models.CharField(max_length=40, unique=True, editable=False)
+    platform = models.TextField(blank=True, default="")
+    device_os = models.TextField(blank=True, default="")
+    device_model = models.TextField(blank=True, default="")
+    app_version = models.TextField(blank=True, default="")
+    lang = models.TextField(blank=True, default="")
+    theme = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = DeviceProfileManager()
+
+    def __str__(self):
+        return " / ".join(value for value in (self.platform, self.device_model, self.app_version) if value)
+
+    @staticmethod
+    def fingerprint_for(values: tuple) -> str:
+        return hashlib.sha1("\x1f".join(values).encode()).hexdigest()
+
+    def as_session_data(self) -> dict:
+        return {field: getattr(self, field) for field in self.PROFILE_FIELDS if getattr(self, field)}
+
+
 class OTPVerificationSession(models.Model):
     OTP_TTL = timedelta(minutes=5)
     RESEND_INTERVAL = timedelta(seconds=60)
@@ -88,12 +153,26 @@ class OTPVerificationSession(models.Model):
     is_verified = models.BooleanField(default=False)
     verified_at = models.DateTimeField(null=True, blank=True)
     consumed_at = models.DateTimeField(null=True, blank=True)
+    # Login metadata: the shared device profile plus the per-login values. Only
+    # sessions consumed before device profiles existed still carry session_data;
+    # read either shape through login_metadata.
+    device_profile = models.ForeignKey(
+        DeviceProfile, null=True, blank=True, on_delete=models.PROTECT, related_name="+", db_index=False
+    )
+    mac_address = models.TextField(blank=True, default="")
+    referral_code = models.TextField(null=True, blank=True)
     session_data = models.JSONField(blank=True, default=dict)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ("-created_at",)
+        indexes = [
+            # Admin keyset pagination and date range filter.
+            models.Index(fields=["created_at", "id"], name="accounts_otp_created_id_idx"),
+            # rollup_logins reads consumed sessions by time range.
+            models.Index(fields=["consumed_at"], name="accounts_otp_consumed_idx"),
+        ]
 
     def __str__(self):
         return f"{self.address} ({self.id})"
@@ -142,6 +221,55 @@ class OTPVerificationSession(models.Model):
 
     def consume(self, session_payload: dict | None = None):
         self.consumed_at = timezone.now()
+        update_fields = ["consumed_at"]
         if session_payload is not None:
-            self.session_data = session_payload
-        self.save(update_fields=["consumed_at", "session_data"])
+            device = dict(session_payload.get("session_data") or {})
+            self.mac_address = device.pop("mac_address", "") or ""
+            self.device_profile_id = DeviceProfile.objects.intern(device)
+            self.referral_code = session_payload.get("referral_code")
+            update_fields += ["device_profile", "mac_address", "referral_code"]
+        self.save(update_fields=update_fields)
+
+    @property
+    def login_metadata(self) -> dict:
+        """The ``{"session_data": ..., "referral_code": ...}`` payload given to ``consume``."""
+        if self.session_data or self.consumed_at is None:
+            return self.session_data
+        session_data = self.device_profile.as_session_data() if self.device_profile_id else {}
+        if self.mac_address:
+            session_data["mac_address"] = self.mac_address
+        return {"session_data": session_data, "referral_code": self.referral_code}
+
+
+class LoginRollup(models.Model):
+    """Logins per hour, platform, app version and referral code; maintained by ``rollup_logins``."""
+
+    DIMENSIONS = ("platform", "app_version", "referral_code")
+
+    hour = models.DateTimeField()
+    platform = models.TextField(blank=True, default="")
+    app_version = models.TextField(blank=True, default="")
+    referral_code = models.TextField(blank=True, default="")
+    logins = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ("-hour",)
+        constraints = [
+            models.UniqueConstraint(
+                fields=["hour", "platform", "app_version", "referral_code"], name="accounts_login_rollup_unique"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.hour:%Y-%m-%d %H:00} {self.platform or '-'} {self.app_version or '-'}: {self.logins}"
+
+
+class RollupWatermark(models.Model):
+    """Everything consumed before ``position`` has been added to the rollup named ``name``."""
+
+    name = models.CharField(max_length=64, primary_key=True)
+    position = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.position:%Y-%m-%d %H:%M:%S}"
@@ -0,0 +1,112 @@
+"""
+Incremental login rollups.
+
+``advance()`` adds sessions consumed between the watermark and ``now - lag``
+to ``LoginRollup`` and moves the watermark, one bounded window per
+transaction. The watermark row is locked for the duration, so concurrent
+runs queue up instead of double counting. The lag covers logins whose
+transaction commits after ``consumed_at`` was stamped; one committing later
+than that is missed, so keep the lag well above the login transaction time.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, Min, TextField, Value
+from django.db.models.fields.json import KT
+from django.db.models.functions import Coalesce, NullIf, TruncHour
+from django.utils import timezone
+
+from .models import LoginRollup, OTPVerificationSession, RollupWatermark
+
+WATERMARK_NAME = "login_rollup"
+DEFAULT_LAG = timedelta(minutes=5)
+DEFAULT_WINDOW = timedelta(hours=6)
+
+
+def _dimension_expressions() -> dict:
+    # New sessions reference a device profile; ones consumed earlier still carry the JSON blob.
+    return {
+        "rollup_platform": Coalesce(
+            "device_profile__platform", KT("session_data__session_data__platform"), Value(""), output_field=TextField()
+        ),
+        "rollup_app_version": Coalesce(
+            "device_profile__app_version",
+            KT("session_data__session_data__app_version"),
+            Value(""),
+            output_field=TextField(),
+        ),
+        # Legacy rows store a missing code as JSON null, which SQLite's KT renders as 'null'.
+        "rollup_referral_code": Coalesce(
+            "referral_code", NullIf(KT("session_data__referral_code"), Value("null")), Value(""), output_field=TextField()
+        ),
+    }
+
+
+def aggregate_window(start, end) -> dict[tuple, int]:
+    """(hour, platform, app_version, referral_code) -> logins for sessions consumed in [start, end)."""
+    rows = (
+        OTPVerificationSession.objects.filter(consumed_at__gte=start, consumed_at__lt=end)
+        .annotate(rollup_hour=TruncHour("consumed_at"), **_dimension_expressions())
+        .values_list("rollup_hour", "rollup_platform", "rollup_app_version", "rollup_referral_code")
+        .annotate(logins=Count("id"))
+        .order_by()
+    )
+    return {tuple(row[:-1]): row[-1] for row in rows}
+
+
+def merge(counts: dict[tuple, int]) -> None:
+    """Add ``counts`` to the stored rollups; the caller holds the watermark lock."""
+    if not counts:
+        return
+    existing = {
+        (rollup.hour, rollup.platform, rollup.app_version, rollup.referral_code): rollup
+        for rollup in LoginRollup.objects.filter(hour__in={key[0] for key in counts})
+    }
+    changed, created = [], []
+    for key, logins in counts.items():
+        rollup = existing.get(key)
+        if rollup is None:
+            hour, platform, app_version, referral_code = key
+            created.append(LoginRollup(
+                hour=hour, platform=platform, app_version=app_version, referral_code=referral_code, logins=logins
+            ))
+        else:
+            rollup.logins += logins
+            changed.append(rollup)
+    LoginRollup.objects.bulk_create(created)
+    LoginRollup.objects.bulk_update(changed, ["logins"])
+
+
+def _initial_position():
+    first = OTPVerificationSession.objects.aggregate(first=Min("consumed_at"))["first"]
+    if first is None:
+        return timezone.now()
+    return first.replace(minute=0, second=0, microsecond=0)
+
+
+def advance(lag: timedelta = DEFAULT_LAG, window: timedelta = DEFAULT_WINDOW, stdout=None) -> int:
+    """Roll up everything consumed up to ``now - lag``; returns the number of sessions added."""
+    RollupWatermark.objects.get_or_create(name=WATERMARK_NAME, defaults={"position": _initial_position})
+    until = timezone.now() - lag
+    added = 0
+    while True:
+        with transaction.atomic():
+            watermark = RollupWatermark.objects.select_for_update().get(name=WATERMARK_NAME)
+            start = watermark.position
+            if start >= until:
+                return added
+            end = min(start + window, until)
+            counts = aggregate_window(start, end)
+            merge(counts)
+            watermark.position = end
+            watermark.save(update_fields=["position", "updated_at"])
+        added += sum(counts.values())
+        if stdout:
+            stdout.write(f"  {start:%Y-%m-%d %H:%M} .. {end:%Y-%m-%d %H:%M}: {sum(counts.values())} logins")
+
+
+def rebuild() -> None:
+    """Drop all rollups and the watermark; the next ``advance`` starts over from the first login."""
+    with transaction.atomic():
+        RollupWatermark.objects.filter(name=WATERMARK_NAME).delete()
+        LoginRollup.objects.all().delete()
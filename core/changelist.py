@@ -0,0 +1,197 @@
+"""
+Admin changelists for tables with tens of millions of rows.
+
+The stock changelist runs an exact ``COUNT(*)`` per page load, pages with
+``OFFSET`` and searches with ``icontains`` (casting UUIDs to text on the way).
+``ScalableAdminMixin`` swaps those for:
+
+* ``EstimatedCountPaginator``: planner statistics instead of ``COUNT(*)``
+  once a table is large;
+* index-friendly search: an exact primary-key match for a UUID, otherwise a
+  ``startswith`` on ``search_prefix_field`` for digits or on
+  ``search_name_fields`` for words (a plain b-tree or ``varchar_pattern_ops``
+  index serves it); any other term matches nothing and a warning lists
+  the accepted forms;
+* ``KeysetChangeList``: with the default ordering, pages continue from a
+  ``cursor`` on (``keyset_field``, pk) instead of an offset.
+"""
+import json
+import re
+import uuid
+from datetime import datetime
+
+from django.contrib import messages
+from django.contrib.admin.views.main import ORDER_VAR, PAGE_VAR, ChangeList
+from django.core.exceptions import EmptyResultSet, ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from django.utils.text import get_text_list
+from django.utils.translation import gettext as _
+
+CURSOR_VAR = "cursor"
+PREFIX_SEARCH = re.compile(r"^\+?\d{2,16}$")
+NAME_SEARCH = re.compile(r"^[^\W\d_][\w' -]+$")
+
+
+def estimate_count(queryset) -> int | None:
+    """Planner estimate of ``queryset.count()``; ``None`` when the database keeps no usable statistics."""
+    if queryset.query.is_empty():
+        return 0
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        if not queryset.query.where:
+            cursor.execute("SELECT reltuples FROM pg_class WHERE oid = %s::regclass", [queryset.model._meta.db_table])
+            row = cursor.fetchone()
+            # -1 until the table has been vacuumed or analyzed.
+            return int(row[0]) if row and row[0] >= 0 else None
+        try:
+            sql, params = queryset.order_by().query.sql_with_params()
+        except EmptyResultSet:
+            # A filter that can match nothing (e.g. ``pk__in=[]``) compiles to no SQL at all.
+            return 0
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class EstimatedCountPaginator(Paginator):
+    """Counts exactly below ``exact_count_threshold`` rows, estimates above it."""
+
+    exact_count_threshold = 10_000
+    is_estimate = False
+
+    @cached_property
+    def count(self):
+        estimate = estimate_count(self.object_list)
+        if estimate is None or estimate < self.exact_count_threshold:
+            self.is_estimate = False
+            return super().count
+        self.is_estimate = True
+        return estimate
+
+
+class KeysetChangeList(ChangeList):
+    def __init__(self, request, *args, **kwargs):
+        self.cursor = request.GET.get(CURSOR_VAR)
+        if CURSOR_VAR in request.GET:
+            # Not a field lookup: keep it away from the filter and preserved-filter machinery.
+            request.GET = request.GET.copy()
+            del request.GET[CURSOR_VAR]
+        self.keyset = False
+        self.next_page_url = self.first_page_url = None
+        super().__init__(request, *args, **kwargs)
+
+    def _keyset_applies(self, request) -> bool:
+        return not (
+            self.model_admin.keyset_field is None
+            or ORDER_VAR in self.params
+            or PAGE_VAR in request.GET
+            or self.show_all
+            or self.list_editable
+        )
+
+    def _decode_cursor(self):
+        value, _, pk = (self.cursor or "").rpartition("_")
+        try:
+            return datetime.fromisoformat(value), self.lookup_opts.pk.to_python(pk)
+        except (ValueError, ValidationError):
+            return None
+
+    def _encode_cursor(self, obj) -> str:
+        return f"{getattr(obj, self.model_admin.keyset_field).isoformat()}_{obj.pk}"
+
+    def get_results(self, request):
+        if not self._keyset_applies(request):
+            return super().get_results(request)
+
+        field = self.model_admin.keyset_field
+        descending = self.model_admin.keyset_descending
+        queryset = self.queryset.order_by(
+            *(f"-{name}" if descending else name for name in (field, "pk"))
+        )
+        position = self._decode_cursor()
+        if position is not None:
+            value, pk = position
+            beyond, past = ("lt", "lte") if descending else ("gt", "gte")
+            # The leading non-strict bound lets the (field, pk) index seek straight to the cursor.
+            queryset = queryset.filter(
+                Q(**{f"{field}__{past}": value}),
+                Q(**{f"{field}__{beyond}": value}) | Q(**{field: value, f"pk__{beyond}": pk}),
+            )
+        rows = list(queryset[: self.list_per_page + 1])
+        has_next = len(rows) > self.list_per_page
+        result_list = rows[: self.list_per_page]
+
+        paginator = self.model_admin.get_paginator(request, self.queryset, self.list_per_page)
+        self.keyset = True
+        if has_next:
+            self.next_page_url = self.get_query_string({CURSOR_VAR: self._encode_cursor(result_list[-1])})
+        if position is not None:
+            self.first_page_url = self.get_query_string()
+        self.result_count = paginator.count
+        self.show_full_result_count = False
+        self.show_admin_actions = True
+        self.full_result_count = None
+        self.result_list = result_list
+        self.can_show_all = False
+        self.multi_page = has_next or position is not None
+        self.paginator = paginator
+
+
+class ScalableAdminMixin:
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    # Field searched with ``startswith`` when the term is not a UUID.
+    search_prefix_field: str | None = None
+    # Fields searched with ``startswith`` when the term is a word of two or more letters.
+    search_name_fields: tuple[str, ...] = ()
+    # Keyset pagination column; pair it with a (keyset_field, pk) index.
+    keyset_field: str | None = None
+    keyset_descending = True
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        try:
+            return queryset.filter(pk=uuid.UUID(term)), False
+        except ValueError:
+            pass
+        if self.search_prefix_field and PREFIX_SEARCH.match(term):
+            lookup = f"{self.search_prefix_field}__startswith"
+            condition = Q(**{lookup: term})
+            if not term.startswith("+"):
+                condition |= Q(**{lookup: f"+{term}"})
+            return queryset.filter(condition), False
+        if self.search_name_fields and NAME_SEARCH.match(term):
+            # Case-sensitive to stay on the index; also try the capitalized spelling, so "ali" finds "Ali".
+            variants = {term, term[:1].upper() + term[1:]}
+            condition = Q()
+            for field in self.search_name_fields:
+                for variant in variants:
+                    condition |= Q(**{f"{field}__startswith": variant})
+            return queryset.filter(condition), False
+        self.message_user(
+            request,
+            _("“%(term)s” cannot be searched. Search by %(forms)s.")
+            % {"term": term, "forms": get_text_list(self.search_forms(), _("or"))},
+            messages.WARNING,
+        )
+        return queryset.none(), False
+
+    def search_forms(self) -> list[str]:
+        forms = [_("ID (UUID)")]
+        if self.search_prefix_field:
+            forms.append(_("the start of a phone number, e.g. +99890"))
+        if self.search_name_fields:
+            forms.append(_("the start of a name"))
+        return forms
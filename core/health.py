@@ -0,0 +1,68 @@
+"""
+Readiness checks behind ``/readyz``.
+
+Each check raises on failure. Results are cached per process for
+``READINESS_CACHE_SECONDS`` so frequent load-balancer probing does not turn
+into a steady stream of queries against Postgres.
+"""
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+
+
+def check_database() -> None:
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+
+
+def check_sms_client() -> None:
+    from apps.accounts.api.auth.views import otp_service
+
+    otp_service.sms_client.ping()
+
+
+def check_cache() -> None:
+    key = f"health:readyz:{os.getpid()}"
+    cache.set(key, "ok", 30)
+    if cache.get(key) != "ok":
+        raise RuntimeError("cache round-trip failed")
+
+
+READINESS_CHECKS = {
+    "database": check_database,
+    "sms": check_sms_client,
+    "cache": check_cache,
+}
+
+
+class ReadinessProbe:
+    def __init__(self, checks: dict):
+        self.checks = checks
+        self._lock = threading.Lock()
+        self._checked_at = float("-inf")
+        self._result: tuple[bool, dict] = (False, {})
+
+    def run_checks(self) -> tuple[bool, dict]:
+        results = {}
+        for name, check in self.checks.items():
+            try:
+                check()
+            except Exception as exc:
+                results[name] = f"error: {type(exc).__name__}"
+            else:
+                results[name] = "ok"
+        return all(result == "ok" for result in results.values()), results
+
+    def status(self) -> tuple[bool, dict]:
+        with self._lock:
+            if time.monotonic() - self._checked_at >= settings.READINESS_CACHE_SECONDS:
+                self._result = self.run_checks()
+                self._checked_at = time.monotonic()
+            return self._result
+
+
+readiness_probe = ReadinessProbe(READINESS_CHECKS)
@@ -0,0 +1,68 @@
+"""
+Per-key mutual exclusion across workers.
+
+On PostgreSQL ``single_flight`` takes a session-level advisory lock, so it
+holds across the commits made inside the block and is released by the
+server if the worker dies. Other databases fall back to a ``cache.add``
+lock, which only coordinates processes sharing the cache. Either way
+waiters poll for at most ``timeout`` seconds and then get ``LockTimeout``,
+so a stuck holder cannot pin every worker thread.
+"""
+import hashlib
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+CACHE_PREFIX = "lock:"
+POLL_INTERVAL = 0.02
+
+
+class LockTimeout(Exception):
+    pass
+
+
+def advisory_lock_id(key: str) -> int:
+    """Stable signed 64-bit id for ``pg_try_advisory_lock``."""
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big", signed=True)
+
+
+def _wait_for(acquire, key: str, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while not acquire():
+        if time.monotonic() >= deadline:
+            raise LockTimeout(key)
+        time.sleep(POLL_INTERVAL)
+
+
+@contextmanager
+def single_flight(key: str, timeout: float = 10, using: str = DEFAULT_DB_ALIAS):
+    """Run the block in one caller at a time per ``key``; the others wait for it to finish."""
+    connection = connections[using]
+    if connection.vendor == "postgresql":
+        lock_id = advisory_lock_id(key)
+
+        def acquire() -> bool:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_try_advisory_lock(%s)", [lock_id])
+                return cursor.fetchone()[0]
+
+        _wait_for(acquire, key, timeout)
+        try:
+            yield
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_unlock(%s)", [lock_id])
+        return
+
+    cache_key = CACHE_PREFIX + key
+    token = uuid.uuid4().hex
+    # The cache entry expires after ``timeout`` so a crashed holder cannot block the key for good.
+    _wait_for(lambda: cache.add(cache_key, token, timeout), key, timeout)
+    try:
+        yield
+    finally:
+        if cache.get(cache_key) == token:
+            cache.delete(cache_key)
@@ -0,0 +1,207 @@
+"""
+Non-blocking JSON logging.
+
+Request threads only put records on a bounded in-memory queue; a writer
+thread per worker formats them as compact JSON lines, strips secrets and
+writes to stderr (journald). When the writer falls behind, INFO and below
+are sampled and, once the queue is full, dropped: a stalled journald slows
+the log, never the request. Dropped records are counted in
+``log_records_dropped_total`` and reported by the writer once it catches up.
+"""
+import atexit
+import contextvars
+import logging
+import os
+import queue
+import random
+import re
+import sys
+import threading
+import time
+import weakref
+
+import orjson
+
+from core import metrics
+
+request_id_var: contextvars.ContextVar[str | None] = contextvars.ContextVar("request_id", default=None)
+
+SENSITIVE_KEYS = ("otp_code", "otp", "client_secret", "password", "access", "refresh", "token")
+REDACTED = "[REDACTED]"
+_SENSITIVE_VALUE = re.compile(
+    r"""(?P<key>["']?\b(?:%s)\b["']?\s*[:=]\s*["']?)[^"'\s,;&}]+""" % "|".join(SENSITIVE_KEYS),
+    re.IGNORECASE,
+)
+_JWT = re.compile(r"\beyJ[\w-]+\.[\w-]+\.[\w-]+")
+
+# Attributes every LogRecord has; anything else was passed through ``extra``.
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+def redact(text: str) -> str:
+    return _JWT.sub(REDACTED, _SENSITIVE_VALUE.sub(rf"\g<key>{REDACTED}", text))
+
+
+def _redact_value(key: str, value):
+    if key.lower() in SENSITIVE_KEYS:
+        return REDACTED
+    if isinstance(value, dict):
+        return {item_key: _redact_value(str(item_key), item) for item_key, item in value.items()}
+    if isinstance(value, str):
+        return redact(value)
+    return value
+
+
+class RedactingFilter(logging.Filter):
+    """Masks secret values in the message and in ``extra`` fields."""
+
+    def filter(self, record):
+        record.msg = redact(record.getMessage())
+        record.args = None
+        for key in vars(record).keys() - _RECORD_ATTRS:
+            setattr(record, key, _redact_value(key, getattr(record, key)))
+        if record.exc_text:
+            record.exc_text = redact(record.exc_text)
+        return True
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key in vars(record).keys() - _RECORD_ATTRS:
+            entry[key] = getattr(record, key)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return orjson.dumps(entry, default=str).decode()
+
+
+class NonBlockingQueueHandler(logging.Handler):
+    """
+    Hands records to a per-process writer thread through a bounded queue.
+
+    Above ``shed_threshold`` (a share of ``maxsize``) only ``overload_sample_rate``
+    of records below WARNING are kept; when the queue is full everything new is
+    dropped. The writer thread is started lazily, so it exists in each forked
+    gunicorn worker rather than only in the preloading master.
+    """
+
+    _STOP = object()
+
+    def __init__(self, maxsize: int = 10000, shed_threshold: float = 0.5, overload_sample_rate: float = 0.1,
+                 stream=None):
+        super().__init__()
+        self.maxsize = maxsize
+        self.shed_above = int(maxsize * shed_threshold)
+        self.overload_sample_rate = overload_sample_rate
+        self.target = logging.StreamHandler(stream or sys.stderr)
+        self.target.setFormatter(JSONFormatter())
+        self.target.addFilter(RedactingFilter())
+        self.dropped = 0
+        self._reset()
+        _live_handlers.add(self)
+
+    def _reset(self) -> None:
+        self.queue = queue.Queue(self.maxsize)
+        self._writer = None
+        self._writer_lock = threading.Lock()
+
+    def _ensure_writer(self) -> None:
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._drain, name="log-writer", daemon=True)
+                self._writer.start()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve everything that depends on the request thread before handing off.
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = self.target.formatter.formatException(record.exc_info)
+            record.exc_info = None
+        request_id = request_id_var.get()
+        if request_id is not None and not hasattr(record, "request_id"):
+            record.request_id = request_id
+        return record
+
+    def emit(self, record):
+        if self._writer is None:
+            self._ensure_writer()
+        log_queue = self.queue
+        if (
+            record.levelno < logging.WARNING
+            and log_queue.qsize() >= self.shed_above
+            and random.random() >= self.overload_sample_rate
+        ):
+            self._drop()
+            return
+        try:
+            log_queue.put_nowait(self.prepare(record))
+        except queue.Full:
+            self._drop()
+        except Exception:
+            self.handleError(record)
+
+    def _drop(self) -> None:
+        self.dropped += 1
+        metrics.LOG_RECORDS_DROPPED.inc()
+
+    def _drain(self) -> None:
+        log_queue = self.queue
+        while True:
+            record = log_queue.get()
+            if record is self._STOP:
+                return
+            self.target.handle(record)
+            if self.dropped and log_queue.empty():
+                # Approximate under contention; the metric is the exact count.
+                dropped, self.dropped = self.dropped, 0
+                self.target.handle(logging.makeLogRecord({
+                    "name": __name__,
+                    "levelno": logging.WARNING,
+                    "levelname": "WARNING",
+                    "msg": "Dropped %d log records: log queue overloaded",
+                    "args": (dropped,),
+                    "created": time.time(),
+                }))
+
+    def flush(self):
+        self.target.flush()
+
+    def close(self):
+        writer = self._writer
+        if writer is not None and writer.is_alive():
+            try:
+                self.queue.put(self._STOP, timeout=1)
+            except queue.Full:
+                pass
+            writer.join(timeout=2)
+            self._writer = None
+        _live_handlers.discard(self)
+        self.target.close()
+        super().close()
+
+
+# Fork and exit hooks are registered once for the module, not per handler: every dictConfig creates new
+# handlers, and per-instance registrations would keep each retired one (and its queue) alive forever.
+_live_handlers: "weakref.WeakSet[NonBlockingQueueHandler]" = weakref.WeakSet()
+
+
+def _reset_after_fork() -> None:
+    for handler in list(_live_handlers):
+        handler._reset()
+
+
+def _close_at_exit() -> None:
+    for handler in list(_live_handlers):
+        handler.close()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+atexit.register(_close_at_exit)
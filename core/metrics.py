@@ -0,0 +1,391 @@
+"""
+Prometheus metrics shared by all gunicorn workers.
+
+Every (process, thread) pair writes to its own shard, a memory-mapped file in
+``METRICS_DIR``. A shard has exactly one writer, so updates take no lock: a
+dict lookup and one ``struct.pack_into``. ``/metrics`` sums the shards of all
+workers. When gunicorn reaps a worker, the master folds its shards into
+``archive.json`` so recycled workers (``max_requests``) neither lose their
+counts nor leave files behind.
+
+Without ``METRICS_DIR`` the shards are anonymous maps and only the current
+process is reported, which is enough for development and tests.
+"""
+import itertools
+import json
+import math
+import mmap
+import os
+import secrets
+import struct
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+
+SHARD_SUFFIX = ".db"
+ARCHIVE_NAME = "archive.json"
+INITIAL_SHARD_SIZE = 64 * 1024
+
+_USED = struct.Struct("q")
+_KEY_LENGTH = struct.Struct("i")
+_VALUE = struct.Struct("d")
+_pack_value = _VALUE.pack_into
+
+
+def _align(position: int) -> int:
+    return (position + 7) & ~7
+
+
+class Shard:
+    """
+    Append-only ``key -> float`` table in a memory-mapped buffer.
+
+    Layout: an 8-byte "bytes used" header, then entries of
+    ``[int32 key length][utf-8 key][padding][float64 value]`` with the value
+    8-byte aligned. New entries are written before the header is bumped, so a
+    concurrent reader never sees a half-written entry.
+    """
+
+    def __init__(self, path: Path | None = None):
+        self.path = path
+        self.slots: dict[str, list] = {}
+        self._file = open(path, "w+b") if path else None
+        self.size = 0
+        self.map = self._map(INITIAL_SHARD_SIZE)
+        self.used = _USED.size
+        _USED.pack_into(self.map, 0, self.used)
+
+    def _map(self, size: int) -> mmap.mmap:
+        self.size = size
+        if self._file is None:
+            return mmap.mmap(-1, size)
+        self._file.truncate(size)
+        return mmap.mmap(self._file.fileno(), size)
+
+    def add(self, key: str, amount: float) -> None:
+        slot = self.slots.get(key)
+        if slot is None:
+            slot = self._allocate(key)
+        slot[1] += amount
+        _pack_value(self.map, slot[0], slot[1])
+
+    def _allocate(self, key: str) -> list:
+        encoded = key.encode()
+        value_offset = _align(self.used + _KEY_LENGTH.size + len(encoded))
+        end = value_offset + _VALUE.size
+        if end > self.size:
+            old_map, used = self.map, self.used
+            self.map = self._map(max(self.size * 2, _align(end)))
+            if self._file is None:
+                self.map[:used] = old_map[:used]
+            old_map.close()
+
+        _KEY_LENGTH.pack_into(self.map, self.used, len(encoded))
+        self.map[self.used + _KEY_LENGTH.size:self.used + _KEY_LENGTH.size + len(encoded)] = encoded
+        _VALUE.pack_into(self.map, value_offset, 0.0)
+        self.used = end
+        _USED.pack_into(self.map, 0, self.used)
+
+        slot = self.slots[key] = [value_offset, 0.0]
+        return slot
+
+    def snapshot(self) -> bytes:
+        return bytes(self.map[:self.used])
+
+
+def read_shard(data: bytes):
+    """Yield ``(key, value)`` pairs from a shard's bytes."""
+    if len(data) < _USED.size:
+        return
+    used = min(_USED.unpack_from(data, 0)[0], len(data))
+    position = _USED.size
+    while position < used:
+        (length,) = _KEY_LENGTH.unpack_from(data, position)
+        key_end = position + _KEY_LENGTH.size + length
+        value_offset = _align(key_end)
+        yield data[position + _KEY_LENGTH.size:key_end].decode(), _VALUE.unpack_from(data, value_offset)[0]
+        position = value_offset + _VALUE.size
+
+
+class ShardStore:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def new_shard(self) -> Shard:
+        directory = settings.METRICS_DIR
+        path = Path(directory) / f"{self._prefix}-{next(self._sequence)}{SHARD_SUFFIX}" if directory else None
+        shard = self.local.shard = Shard(path)
+        with self._lock:
+            self.shards.append(shard)
+        return shard
+
+    def reset(self) -> None:
+        """Forget the shards of this process (a forked child must not write its parent's files)."""
+        # The random part keeps a recycled pid from reusing a shard name the archive lists as merged.
+        self._prefix = f"{os.getpid()}-{secrets.token_hex(4)}"
+        self._sequence = itertools.count()
+        self.local = threading.local()
+        self.shards: list[Shard] = []
+
+    def collect(self) -> dict[str, float]:
+        totals = defaultdict(float)
+        directory = settings.METRICS_DIR
+        if not directory:
+            with self._lock:
+                snapshots = [shard.snapshot() for shard in self.shards]
+            for data in snapshots:
+                for key, value in read_shard(data):
+                    totals[key] += value
+            return totals
+
+        # Read the live shards before the archive: a shard that was merged and
+        # deleted meanwhile is then always listed as merged in what we read.
+        per_shard = {}
+        for path in Path(directory).glob(f"*{SHARD_SUFFIX}"):
+            try:
+                per_shard[path.name] = list(read_shard(path.read_bytes()))
+            except FileNotFoundError:
+                continue
+        archive = read_archive(Path(directory))
+        merged = set(archive["merged"])
+        for key, value in archive["values"].items():
+            totals[key] += value
+        for name, samples in per_shard.items():
+            if name in merged:
+                continue
+            for key, value in samples:
+                totals[key] += value
+        return totals
+
+
+_store = ShardStore()
+os.register_at_fork(after_in_child=_store.reset)
+
+
+def read_archive(directory: Path) -> dict:
+    try:
+        return json.loads((directory / ARCHIVE_NAME).read_text())
+    except FileNotFoundError:
+        return {"merged": [], "values": {}}
+
+
+def merge_dead_process(directory: str, pid: int) -> None:
+    """
+    Fold a reaped worker's shards into the archive and delete them.
+
+    Runs in the gunicorn master only, so the archive has a single writer. The
+    archive is replaced atomically and lists the merged shard names, which
+    keeps a concurrent scrape from counting a shard twice.
+    """
+    directory = Path(directory)
+    dead = sorted(directory.glob(f"{pid}-*{SHARD_SUFFIX}"))
+    if not dead:
+        return
+    archive = read_archive(directory)
+    values = defaultdict(float, archive["values"])
+    for path in dead:
+        for key, value in read_shard(path.read_bytes()):
+            values[key] += value
+
+    live = {path.name for path in directory.glob(f"*{SHARD_SUFFIX}")}
+    merged = [name for name in archive["merged"] if name in live] + [path.name for path in dead]
+    temporary = directory / f".{ARCHIVE_NAME}.tmp"
+    temporary.write_text(json.dumps({"merged": merged, "values": values}))
+    os.replace(temporary, directory / ARCHIVE_NAME)
+    for path in dead:
+        path.unlink(missing_ok=True)
+
+
+def clear_metrics_dir(directory: str) -> None:
+    """Start from zero: called by the gunicorn master before any worker exists."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    for path in directory.iterdir():
+        if path.suffix == SHARD_SUFFIX or path.name == ARCHIVE_NAME:
+            path.unlink()
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format_labels(labels: dict) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+
+def _braces(labelstr: str) -> str:
+    return f"{{{labelstr}}}" if labelstr else ""
+
+
+REGISTRY: dict[str, "Metric"] = {}
+
+
+class Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple | list = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        REGISTRY[name] = self
+
+    def labels(self, **labels):
+        values = tuple(map(labels.__getitem__, self.labelnames))
+        child = self._children.get(values)
+        if child is None:
+            child = self._children[values] = self._child(_format_labels(dict(zip(self.labelnames, values))))
+        return child
+
+    def key(self, labelstr: str, kind: str) -> str:
+        return f"{self.name}\t{labelstr}\t{kind}"
+
+    def render(self, samples: dict) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        labelstrs = sorted(samples) or ([""] if not self.labelnames else [])
+        for labelstr in labelstrs:
+            lines.extend(self._render_series(labelstr, samples.get(labelstr, {})))
+        return lines
+
+
+class _CounterChild:
+    __slots__ = ("key",)
+
+    def __init__(self, key: str):
+        self.key = key
+
+    def inc(self, amount: float = 1.0) -> None:
+        try:
+            shard = _store.local.shard
+        except AttributeError:
+            shard = _store.new_shard()
+        shard.add(self.key, amount)
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def _child(self, labelstr: str) -> _CounterChild:
+        return _CounterChild(self.key(labelstr, "value"))
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def _render_series(self, labelstr: str, series: dict) -> list[str]:
+        return [f"{self.name}{_braces(labelstr)} {_format_value(series.get('value', 0.0))}"]
+
+
+class _HistogramChild:
+    __slots__ = ("upper_bounds", "bucket_keys", "sum_key")
+
+    def __init__(self, upper_bounds: tuple, bucket_keys: list, sum_key: str):
+        self.upper_bounds = upper_bounds
+        self.bucket_keys = bucket_keys
+        self.sum_key = sum_key
+
+    def observe(self, value: float) -> None:
+        try:
+            shard = _store.local.shard
+        except AttributeError:
+            shard = _store.new_shard()
+        # Buckets are stored non-cumulative; rendering adds them up.
+        shard.add(self.bucket_keys[bisect_left(self.upper_bounds, value)], 1.0)
+        shard.add(self.sum_key, value)
+
+    @contextmanager
+    def time(self):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple | list = (), *, buckets: tuple):
+        super().__init__(name, documentation, labelnames)
+        self.upper_bounds = tuple(sorted(float(bound) for bound in buckets))
+
+    def _child(self, labelstr: str) -> _HistogramChild:
+        bucket_keys = [self.key(labelstr, _format_value(bound)) for bound in (*self.upper_bounds, math.inf)]
+        return _HistogramChild(self.upper_bounds, bucket_keys, self.key(labelstr, "sum"))
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def time(self):
+        return self.labels().time()
+
+    def _render_series(self, labelstr: str, series: dict) -> list[str]:
+        prefix = f"{labelstr}," if labelstr else ""
+        lines, cumulative = [], 0.0
+        for bound in (*self.upper_bounds, math.inf):
+            le = _format_value(bound)
+            cumulative += series.get(le, 0.0)
+            lines.append(f'{self.name}_bucket{{{prefix}le="{le}"}} {_format_value(cumulative)}')
+        lines.append(f"{self.name}_sum{_braces(labelstr)} {_format_value(series.get('sum', 0.0))}")
+        lines.append(f"{self.name}_count{_braces(labelstr)} {_format_value(cumulative)}")
+        return lines
+
+
+def generate_latest() -> str:
+    """Render every registered metric, summed over all shards, in Prometheus text format 0.0.4."""
+    grouped = defaultdict(lambda: defaultdict(dict))
+    for key, value in _store.collect().items():
+        name, labelstr, kind = key.split("\t")
+        grouped[name][labelstr][kind] = value
+
+    lines = []
+    for name, metric in sorted(REGISTRY.items()):
+        lines.extend(metric.render(grouped.get(name, {})))
+    return "\n".join(lines) + "\n"
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time spent in Django per request, by URL name.",
+    ["view"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_RESPONSES = Counter("http_responses_total", "Responses by URL name and status class.", ["view", "status"])
+HTTP_REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Database queries executed per request, by URL name.",
+    ["view"],
+    buckets=(0, 1, 2, 3, 4, 6, 8, 12, 20, 50),
+)
+
+OTP_EVENTS = Counter("otp_events_total", "OTP workflow outcomes.", ["event"])
+OTP_ISSUED = OTP_EVENTS.labels(event="issued")
+OTP_THROTTLED = OTP_EVENTS.labels(event="throttled")
+OTP_VERIFIED = OTP_EVENTS.labels(event="verified")
+OTP_FAILED = OTP_EVENTS.labels(event="failed")
+OTP_MAX_ATTEMPTS = OTP_EVENTS.labels(event="max_attempts")
+
+SMS_SEND_DURATION = Histogram(
+    "sms_send_duration_seconds",
+    "Latency of SMS client send_otp calls.",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+LOGINS = Counter("auth_logins_total", "Login attempts by outcome.", ["outcome"])
+LOGIN_SUCCEEDED = LOGINS.labels(outcome="success")
+LOGIN_REJECTED = LOGINS.labels(outcome="rejected")
+
+LOG_RECORDS_DROPPED = Counter("log_records_dropped_total", "Log records shed or dropped because the log queue was behind.")
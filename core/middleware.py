@@ -0,0 +1,305 @@
+import json
+import logging
+import random
+import re
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.handlers.exception import convert_exception_to_response
+from django.db import connection
+from django.http import HttpResponse, JsonResponse
+from django.utils.module_loading import import_string
+
+from core import metrics, timing
+from core.health import readiness_probe
+from core.logs import request_id_var
+from core.profiling import TOKEN_HEADER, get_profiler
+
+timing_logger = logging.getLogger("core.timing")
+access_logger = logging.getLogger("core.access")
+
+
+class HealthProbeMiddleware:
+    """
+    Answers ``/healthz`` and ``/readyz`` before any other middleware runs.
+
+    Liveness is a constant response: no host validation, URL resolution or
+    view dispatch. Readiness reports the cached dependency checks from
+    ``core.health`` and returns 503 when any of them fails.
+    """
+
+    LIVENESS_PATHS = ("/healthz", "/healthz/")
+    READINESS_PATHS = ("/readyz", "/readyz/")
+    LIVENESS_BODY = b'{"status":"ok"}'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        path = request.path_info
+        if path in self.LIVENESS_PATHS:
+            return HttpResponse(self.LIVENESS_BODY, content_type="application/json")
+        if path in self.READINESS_PATHS:
+            ready, checks = readiness_probe.status()
+            return JsonResponse(
+                {"status": "ok" if ready else "fail", "checks": checks},
+                status=200 if ready else 503,
+            )
+        return self.get_response(request)
+
+
+class AccessLogMiddleware:
+    """
+    One structured ``core.access`` line per request, replacing gunicorn's
+    access log: request id, view, status, duration, query count and DB time.
+
+    The request id comes from a sane ``X-Request-ID`` header (e.g. set by
+    Nginx) or is generated. It is echoed back and attached to every log
+    record emitted while the request runs.
+    """
+
+    REQUEST_ID_HEADER = "X-Request-ID"
+    REQUEST_ID_PATTERN = re.compile(r"^[\w.-]{1,64}$")
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request_id = request.headers.get(self.REQUEST_ID_HEADER, "")
+        if not self.REQUEST_ID_PATTERN.match(request_id):
+            request_id = uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            request_id_var.reset(token)
+        duration_ms = (time.perf_counter() - started) * 1000
+
+        response[self.REQUEST_ID_HEADER] = request_id
+        match = getattr(request, "resolver_match", None)
+        queries, db_seconds = getattr(request, "db_stats", (0, 0.0))
+        access_logger.info(
+            "%s %s %s",
+            request.method,
+            request.path_info,
+            response.status_code,
+            extra={
+                "request_id": request_id,
+                "view": match.view_name if match is not None else None,
+                "method": request.method,
+                "path": request.path_info,
+                "status": response.status_code,
+                "duration_ms": round(duration_ms, 2),
+                "db_queries": queries,
+                "db_ms": round(db_seconds * 1000, 2),
+            },
+        )
+        return response
+
+
+class BrowserOnlyMiddleware:
+    """
+    Runs ``settings.BROWSER_MIDDLEWARE`` for every path except
+    ``settings.LEAN_MIDDLEWARE_PATH_PREFIXES``.
+
+    The stateless JSON API never touches sessions, CSRF cookies, ``request.user``
+    or messages, so those paths skip the whole inner chain. Admin and docs keep
+    the full stack, including the ``process_view``/``process_exception``/
+    ``process_template_response`` hooks of the wrapped middleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.lean_prefixes = tuple(settings.LEAN_MIDDLEWARE_PATH_PREFIXES)
+        self._view_middleware = []
+        self._template_response_middleware = []
+        self._exception_middleware = []
+
+        # Mirrors BaseHandler.load_middleware for the wrapped (sync) chain.
+        handler = convert_exception_to_response(get_response)
+        for middleware_path in reversed(settings.BROWSER_MIDDLEWARE):
+            middleware = import_string(middleware_path)
+            try:
+                mw_instance = middleware(handler)
+            except MiddlewareNotUsed:
+                continue
+
+            if hasattr(mw_instance, "process_view"):
+                self._view_middleware.insert(0, mw_instance.process_view)
+            if hasattr(mw_instance, "process_template_response"):
+                self._template_response_middleware.append(mw_instance.process_template_response)
+            if hasattr(mw_instance, "process_exception"):
+                self._exception_middleware.append(mw_instance.process_exception)
+
+            handler = convert_exception_to_response(mw_instance)
+        self.browser_chain = handler
+
+    def is_lean(self, request) -> bool:
+        return request.path_info.startswith(self.lean_prefixes)
+
+    def __call__(self, request):
+        if self.is_lean(request):
+            return self.get_response(request)
+        return self.browser_chain(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if self.is_lean(request):
+            return None
+        for process_view in self._view_middleware:
+            response = process_view(request, view_func, view_args, view_kwargs)
+            if response:
+                return response
+        return None
+
+    def process_template_response(self, request, response):
+        if self.is_lean(request):
+            return response
+        for process_template_response in self._template_response_middleware:
+            response = process_template_response(request, response)
+        return response
+
+    def process_exception(self, request, exception):
+        if self.is_lean(request):
+            return None
+        for process_exception in self._exception_middleware:
+            response = process_exception(request, exception)
+            if response:
+                return response
+        return None
+
+
+class ServerTimingMiddleware:
+    """
+    Times a sample of requests and reports the breakdown in a ``Server-Timing``
+    header and one JSON log line on ``core.timing``.
+
+    Disabled unless ``REQUEST_TIMING_ENABLED``; ``REQUEST_TIMING_SAMPLE_RATE``
+    picks the share of requests that are measured. Every query is counted in
+    the ``db`` section through a connection execute wrapper, the views add
+    ``sms`` and ``jwt`` sections, and response rendering is reported as
+    ``render``.
+    """
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_TIMING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = settings.REQUEST_TIMING_SAMPLE_RATE
+
+    def __call__(self, request):
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        timings = timing.RequestTimings()
+        token = timing.activate(timings)
+        try:
+            with connection.execute_wrapper(timings.db_wrapper):
+                response = self.get_response(request)
+        finally:
+            timing.deactivate(token)
+
+        self.report(request, response, timings)
+        return response
+
+    def process_template_response(self, request, response):
+        timings = timing.current_timings()
+        if timings is not None:
+            started = time.perf_counter()
+            response.add_post_render_callback(lambda _: timings.add("render", time.perf_counter() - started))
+        return response
+
+    def report(self, request, response, timings: timing.RequestTimings) -> None:
+        total_ms = timings.total_ms()
+        metrics = [
+            f'{name};dur={duration:.2f};desc="{count}x"'
+            for name, (duration, count) in timings.sections.items()
+        ]
+        metrics.append(f"total;dur={total_ms:.2f}")
+        response["Server-Timing"] = ", ".join(metrics)
+
+        timing_logger.info(json.dumps({
+            "event": "request_timing",
+            "method": request.method,
+            "path": request.path_info,
+            "status": response.status_code,
+            "total_ms": round(total_ms, 2),
+            "sections": {
+                name: {"ms": round(duration, 2), "count": count}
+                for name, (duration, count) in timings.sections.items()
+            },
+        }, separators=(",", ":")))
+
+
+class MetricsMiddleware:
+    """
+    Records latency, status class and query count per URL name into
+    ``core.metrics``. Unresolved paths share the ``unmatched`` label so
+    scanners cannot blow up the series count. The query count and DB time
+    are left on ``request.db_stats`` for the access log.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries, db_seconds = 0, 0.0
+
+        def count_query(execute, sql, params, many, context):
+            nonlocal queries, db_seconds
+            queries += 1
+            query_started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                db_seconds += time.perf_counter() - query_started
+
+        started = time.perf_counter()
+        with connection.execute_wrapper(count_query):
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+        request.db_stats = (queries, db_seconds)
+
+        match = getattr(request, "resolver_match", None)
+        view = match.view_name if match is not None else "unmatched"
+        metrics.HTTP_REQUEST_DURATION.labels(view=view).observe(duration)
+        metrics.HTTP_REQUEST_DB_QUERIES.labels(view=view).observe(queries)
+        metrics.HTTP_RESPONSES.labels(view=view, status=f"{response.status_code // 100}xx").inc()
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Runs the stack sampler from ``core.profiling`` around the requests it
+    selects and writes one folded-stack dump per request. Requests with an
+    ``X-Profile-Token`` get the dump name back in ``X-Profile-Dump``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.prefixes = tuple(settings.PROFILE_PATH_PREFIXES)
+
+    def __call__(self, request):
+        if not request.path_info.startswith(self.prefixes):
+            return self.get_response(request)
+        profiler = get_profiler()
+        if not profiler.should_profile(request):
+            return self.get_response(request)
+
+        ident = threading.get_ident()
+        started = time.perf_counter()
+        profiler.sampler.start(ident)
+        try:
+            response = self.get_response(request)
+        finally:
+            stacks = profiler.sampler.stop(ident)
+        duration = time.perf_counter() - started
+
+        match = getattr(request, "resolver_match", None)
+        path = profiler.dump(match.view_name if match is not None else "unmatched", duration, stacks)
+        if TOKEN_HEADER in request.headers:
+            response["X-Profile-Dump"] = path.name
+        return response
@@ -0,0 +1,140 @@
+"""
+Precomputed OpenAPI documents.
+
+The schema only changes on deploy, so it is generated once, by
+``manage.py build_openapi_schema`` at deploy time or lazily on the first
+request in each process, and served from memory with a strong ETag,
+``304 Not Modified`` and a gzip variant compressed ahead of time.
+"""
+import gzip
+import hashlib
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.http import require_safe
+from drf_yasg import openapi
+from drf_yasg.codecs import OpenAPICodecJson, OpenAPICodecYaml
+from drf_yasg.generators import OpenAPISchemaGenerator
+
+API_INFO = openapi.Info(
+    title="Test24 API",
+    default_version="v1",
+    description="Test24 API Documentation",
+)
+
+SCHEMA_CACHE_CONTROL = "public, max-age=300"
+# Pinned rather than derived from the routed endpoints, so adding an API outside /auth/ (the staff-only
+# analytics, kept out of the schema) cannot move basePath and rename every path key for client generators.
+API_BASE_PATH = "/api/v1/auth/"
+
+
+class BothHttpAndHttpsSchemaGenerator(OpenAPISchemaGenerator):
+    def determine_path_prefix(self, paths):
+        return API_BASE_PATH
+
+    def get_schema(self, request=None, public=False):
+        schema = super().get_schema(request, public)
+        schema.schemes = ["http", "https"]
+        if settings.DEBUG is False:
+            schema.schemes = ["https", "http"]
+        return schema
+
+
+class SchemaDocument:
+    """One encoded schema representation with its gzip variant and ETags."""
+
+    def __init__(self, body: bytes, content_type: str, gzip_body: bytes | None = None):
+        self.body = body
+        self.content_type = content_type
+        self.gzip_body = gzip_body if gzip_body is not None else gzip.compress(body, compresslevel=9, mtime=0)
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        self.etag = f'"{digest}"'
+        self.gzip_etag = f'"{digest}-gzip"'
+
+
+SCHEMA_FORMATS = {
+    "docs.json": (OpenAPICodecJson, "application/json"),
+    "docs.yaml": (OpenAPICodecYaml, "application/yaml"),
+}
+
+
+def render_schema() -> dict[str, bytes]:
+    """Generate the public schema (no request, so no host is baked in) in every served format."""
+    generator = BothHttpAndHttpsSchemaGenerator(API_INFO)
+    schema = generator.get_schema(request=None, public=True)
+    return {name: codec_class(validators=[]).encode(schema) for name, (codec_class, _) in SCHEMA_FORMATS.items()}
+
+
+def _read(path: Path) -> bytes | None:
+    try:
+        return path.read_bytes()
+    except FileNotFoundError:
+        return None
+
+
+@lru_cache(maxsize=None)
+def get_schema_documents() -> dict[str, SchemaDocument]:
+    schema_dir = Path(settings.OPENAPI_SCHEMA_DIR)
+    prebuilt = {name: _read(schema_dir / name) for name in SCHEMA_FORMATS}
+    if any(body is None for body in prebuilt.values()):
+        prebuilt = render_schema()
+        gzipped = {}
+    else:
+        gzipped = {name: _read(schema_dir / f"{name}.gz") for name in SCHEMA_FORMATS}
+
+    return {
+        name: SchemaDocument(body, SCHEMA_FORMATS[name][1], gzipped.get(name))
+        for name, body in prebuilt.items()
+    }
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    return etag in {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    """Whether ``Accept-Encoding`` gives gzip (by name, or through ``*``) a non-zero q-value."""
+    qualities = {}
+    for item in accept_encoding.split(","):
+        coding, *params = (part.strip() for part in item.split(";"))
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding:
+            qualities[coding.lower()] = quality
+    return qualities.get("gzip", qualities.get("*", 0.0)) > 0
+
+
+def schema_document_view(name: str):
+    """Build a view serving the precomputed ``name`` document."""
+
+    @require_safe
+    def view(request):
+        document = get_schema_documents()[name]
+        use_gzip = _accepts_gzip(request.headers.get("Accept-Encoding", ""))
+        etag = document.gzip_etag if use_gzip else document.etag
+
+        # Only the selected representation's ETag validates it; the other one names different bytes.
+        if _etag_matches(request.headers.get("If-None-Match", ""), etag):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(document.gzip_body if use_gzip else document.body, content_type=document.content_type)
+            if use_gzip:
+                response["Content-Encoding"] = "gzip"
+
+        response["ETag"] = etag
+        response["Cache-Control"] = SCHEMA_CACHE_CONTROL
+        patch_vary_headers(response, ("Accept-Encoding",))
+        return response
+
+    return view
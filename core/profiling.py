@@ -0,0 +1,168 @@
+"""
+On-demand sampling profiler for live workers.
+
+A background thread reads the stacks of the request threads being profiled
+from ``sys._current_frames()`` every ``PROFILE_INTERVAL_MS``; the request
+thread itself runs unmodified. Each profiled request is written to
+``PROFILE_DIR`` as a folded-stack file (``frame;frame;frame count``, the
+input format of flamegraph.pl and speedscope) named after the view and the
+request duration. ``manage.py profile_report`` merges them.
+
+A request under ``PROFILE_PATH_PREFIXES`` is profiled when any of these holds:
+
+* a ``PROFILE_SAMPLE_RATE`` share of requests, from the environment;
+* every request for ``SIGNAL_WINDOW_SECONDS`` after the worker receives
+  SIGUSR2 (a second signal stops it early);
+* the request carries an ``X-Profile-Token`` issued by
+  ``manage.py profile_report --token``.
+"""
+import collections
+import os
+import random
+import re
+import signal
+import sys
+import sysconfig
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.signing import BadSignature, TimestampSigner
+
+TOKEN_HEADER = "X-Profile-Token"
+TOKEN_SALT = "core.profiling"
+TOKEN_VALUE = "profile"
+TOKEN_MAX_AGE = 60 * 60
+SIGNAL_WINDOW_SECONDS = 5 * 60
+DUMP_SUFFIX = ".folded"
+DUMP_NAME = re.compile(r"^(?P<timestamp>\d+)-(?P<pid>\d+)-(?P<view>.+)-(?P<duration>\d+)ms\.folded$")
+
+# Frame labels show paths relative to these, longest first.
+_LIBRARY_ROOTS = tuple(sorted(
+    {sysconfig.get_paths()["purelib"], sysconfig.get_paths()["stdlib"], str(settings.BASE_DIR)},
+    key=len,
+    reverse=True,
+))
+
+
+def issue_token() -> str:
+    return TimestampSigner(salt=TOKEN_SALT).sign(TOKEN_VALUE)
+
+
+def token_is_valid(token: str) -> bool:
+    try:
+        return TimestampSigner(salt=TOKEN_SALT).unsign(token, max_age=TOKEN_MAX_AGE) == TOKEN_VALUE
+    except BadSignature:
+        return False
+
+
+_labels: dict = {}
+
+
+def _frame_label(code) -> str:
+    label = _labels.get(code)
+    if label is None:
+        filename = code.co_filename
+        for root in _LIBRARY_ROOTS:
+            if filename.startswith(root):
+                filename = filename[len(root):].lstrip(os.sep)
+                break
+        label = _labels[code] = f"{code.co_qualname} ({filename}:{code.co_firstlineno})"
+    return label
+
+
+def fold(frame) -> str:
+    """Render a stack root-first as one folded-stack key."""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame.f_code))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class StackSampler:
+    """One daemon thread per process sampling every registered request thread."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._targets: dict[int, collections.Counter] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def start(self, ident: int) -> None:
+        with self._lock:
+            self._targets[ident] = collections.Counter()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+
+    def stop(self, ident: int) -> collections.Counter:
+        with self._lock:
+            return self._targets.pop(ident, collections.Counter())
+
+    def _run(self) -> None:
+        while True:
+            if not self._targets:
+                self._wakeup.wait()
+                self._wakeup.clear()
+                continue
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            with self._lock:
+                targets = list(self._targets.items())
+            for ident, stacks in targets:
+                frame = frames.get(ident)
+                if frame is not None:
+                    stacks[fold(frame)] += 1
+
+
+class Profiler:
+    def __init__(self):
+        self.sampler = StackSampler(settings.PROFILE_INTERVAL_MS / 1000)
+        self.signal_until = 0.0
+
+    def toggle_signal_window(self, signum=None, frame=None) -> None:
+        now = time.monotonic()
+        self.signal_until = 0.0 if self.signal_until > now else now + SIGNAL_WINDOW_SECONDS
+
+    def should_profile(self, request) -> bool:
+        token = request.headers.get(TOKEN_HEADER)
+        if token:
+            return token_is_valid(token)
+        if self.signal_until > time.monotonic():
+            return True
+        return random.random() < settings.PROFILE_SAMPLE_RATE
+
+    def dump(self, view: str, duration: float, stacks: collections.Counter) -> Path:
+        directory = Path(settings.PROFILE_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        name = f"{int(time.time() * 1000)}-{os.getpid()}-{view.replace(':', '.')}-{round(duration * 1000)}ms{DUMP_SUFFIX}"
+        path = directory / name
+        path.write_text("".join(f"{stack} {count}\n" for stack, count in stacks.items()))
+        return path
+
+
+_profiler = None
+
+
+def get_profiler() -> Profiler:
+    global _profiler
+    if _profiler is None:
+        _profiler = Profiler()
+    return _profiler
+
+
+def _reset_after_fork() -> None:
+    global _profiler
+    _profiler = None
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def install_signal_handler() -> None:
+    """Called from gunicorn's ``post_worker_init``: SIGUSR2 toggles the profiling window."""
+    signal.signal(signal.SIGUSR2, get_profiler().toggle_signal_window)
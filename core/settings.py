@@ -27,15 +27,59 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.HealthProbeMiddleware',
+    'core.middleware.AccessLogMiddleware',
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.ServerTimingMiddleware',
+    'core.middleware.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'core.middleware.BrowserOnlyMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+# Session/CSRF/auth/messages faqat admin va docs uchun kerak; stateless JSON API
+# yo'llari (LEAN_MIDDLEWARE_PATH_PREFIXES) bu zanjirni butunlay chetlab o'tadi.
+BROWSER_MIDDLEWARE = [
+    'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+LEAN_MIDDLEWARE_PATH_PREFIXES = (
+    '/api/v1/auth/',
+    '/api/v1/analytics/',
+    '/api/v1/docs.',
+    '/metrics',
+)
+
+# /readyz natijalari (DB, SMS, cache) shuncha sekund keshlanadi
+READINESS_CACHE_SECONDS = int(os.getenv('READINESS_CACHE_SECONDS', '5'))
+
+# Server-Timing sarlavhasi va core.timing log yozuvi (DB, SMS, JWT, render vaqtlari).
+# SAMPLE_RATE: o'lchanadigan so'rovlar ulushi (0..1)
+REQUEST_TIMING_ENABLED = os.getenv('REQUEST_TIMING_ENABLED', 'False').lower() == 'true'
+REQUEST_TIMING_SAMPLE_RATE = float(os.getenv('REQUEST_TIMING_SAMPLE_RATE', '0.05'))
+
+# Prometheus /metrics: har bir worker oqimi shu papkadagi o'z fayliga yozadi.
+# Bo'sh bo'lsa, faqat joriy jarayon xotirasida saqlanadi (dev, testlar)
+METRICS_DIR = os.getenv('METRICS_DIR', '')
+
+# Namuna oluvchi profiler (core.profiling): folded stack fayllari PROFILE_DIR ga yoziladi.
+# SIGUSR2 yoki X-Profile-Token sarlavhasi bilan ham yoqiladi
+PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', '0'))
+PROFILE_INTERVAL_MS = float(os.getenv('PROFILE_INTERVAL_MS', '5'))
+PROFILE_DIR = os.getenv('PROFILE_DIR', str(BASE_DIR / 'profiles'))
+PROFILE_PATH_PREFIXES = ('/api/v1/auth/',)
+
+# Faqat yuklama testi muhiti uchun: OTP kodlari SMS o'rniga shu manzilga POST qilinadi
+# (manage.py loadtest_auth --sms-sink). Productionda bo'sh qoldiring!
+SMS_SINK_URL = os.getenv('SMS_SINK_URL', '')
+
+# Admin tekshiruvlari faqat MIDDLEWARE ro'yxatiga qaraydi; ular BROWSER_MIDDLEWARE ichida bor.
+SILENCED_SYSTEM_CHECKS = ['admin.E408', 'admin.E409', 'admin.E410']
+
 ROOT_URLCONF = 'core.urls'
 
 TEMPLATES = [
@@ -102,6 +146,9 @@ DATABASES = {
         'PASSWORD': db_config['PASSWORD'],
         'HOST': db_config['HOST'],
         'PORT': db_config['PORT'],
+        # Gunicorn workerlari ulanishni so'rovlar orasida qayta ishlatadi (sekundlarda)
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '60')),
+        'CONN_HEALTH_CHECKS': True,
         'OPTIONS': {
             'connect_timeout': 10,
         },
@@ -133,6 +180,11 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
+# collectstatic hash nomli fayllar va ularning .gz/.br nusxalarini yozadi (nginx gzip_static/brotli_static)
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'core.storage.CompressedManifestStaticFilesStorage'},
+}
 
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
@@ -140,6 +192,31 @@ MEDIA_ROOT = BASE_DIR / 'media'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 AUTH_USER_MODEL = 'accounts.User'
 
+# Loglar: so'rov oqimi faqat navbatga qo'yadi, yozishni har bir workerdagi fon oqimi bajaradi.
+# Navbat to'lsa INFO yozuvlari tashlab yuboriladi (so'rov kutib qolmaydi); maxfiy qiymatlar yashiriladi
+LOG_LEVEL = os.getenv('DJANGO_LOG_LEVEL', 'INFO')
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'queue': {
+            '()': 'core.logs.NonBlockingQueueHandler',
+            'maxsize': int(os.getenv('LOG_QUEUE_SIZE', '10000')),
+        },
+    },
+    'root': {
+        'handlers': ['queue'],
+        'level': LOG_LEVEL,
+    },
+    'loggers': {
+        'django': {
+            'handlers': ['queue'],
+            'level': LOG_LEVEL,
+            'propagate': False,
+        },
+    },
+}
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
@@ -147,6 +224,15 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.AllowAny',
     ),
+    'DEFAULT_PARSER_CLASSES': (
+        'core.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'core.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
 }
 
 SIMPLE_JWT = {
@@ -156,10 +242,19 @@ SIMPLE_JWT = {
     'BLACKLIST_AFTER_ROTATION': False,
 }
 
+# Ichki servislar auth/introspect/ endpointiga shu token bilan murojaat qiladi
+INTERNAL_API_TOKEN = os.getenv('INTERNAL_API_TOKEN', '')
+
 SWAGGER_SETTINGS = {
     'SECURITY_DEFINITIONS': {},
+    # Swagger UI sxemani oldindan tayyorlangan (ETag bilan keshlanadigan) docs.json'dan oladi
+    'SPEC_URL': 'schema-json',
 }
 
+# `manage.py build_openapi_schema` deploy vaqtida shu papkaga yozadi
+OPENAPI_SCHEMA_DIR = BASE_DIR / 'openapi'
+
+
 JAZZMIN_SETTINGS = {
     "site_title": "Test24 Admin",
     "site_header": "Test24",
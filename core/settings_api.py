@@ -0,0 +1,41 @@
+"""
+API-only settings profile for the auth workers (``core.wsgi_api`` / ``core.asgi_api``).
+
+Admin, docs, sessions, messages and staticfiles are served by a separate
+small process running ``core.settings``; leaving them out here keeps them
+off each API worker's import path and out of its resident memory.
+"""
+from core.settings import *  # noqa: F401,F403
+from core.settings import REST_FRAMEWORK
+
+INSTALLED_APPS = [
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'rest_framework',
+    'apps.accounts',
+]
+
+MIDDLEWARE = [
+    'core.middleware.HealthProbeMiddleware',
+    'core.middleware.AccessLogMiddleware',
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.ServerTimingMiddleware',
+    'core.middleware.ProfilingMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+ROOT_URLCONF = 'core.urls_api'
+
+WSGI_APPLICATION = 'core.wsgi_api.application'
+
+# JSON only: no browsable API, so no template engine either.
+TEMPLATES = []
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_RENDERER_CLASSES': (
+        'core.renderers.ORJSONRenderer',
+    ),
+}
@@ -0,0 +1,62 @@
+"""
+Static files storage for the admin process.
+
+``collectstatic`` writes content-hashed copies (``base.3f2a1b9c0d1e.css``)
+and, for text assets, ``.gz`` and ``.br`` siblings next to them. Nginx
+serves the siblings with ``gzip_static`` / ``brotli_static`` and marks
+hashed names ``immutable``. Brotli needs the optional ``brotli`` package;
+without it only ``.gz`` files are written.
+"""
+import gzip
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = (
+    ".css", ".js", ".mjs", ".map", ".json", ".svg", ".txt", ".html", ".xml", ".ttf", ".otf", ".eot", ".ico",
+)
+# Below this size the response headers outweigh the savings.
+MIN_COMPRESS_SIZE = 256
+
+
+def _compressors() -> dict:
+    compressors = {".gz": lambda data: gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        compressors[".br"] = lambda data: brotli.compress(data, quality=11)
+    return compressors
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    def stored_name(self, name):
+        # No manifest until collectstatic has run (checkouts, tests): keep the plain names.
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if not dry_run:
+            self.compress(self.hashed_files.values())
+
+    def compress(self, names) -> None:
+        compressors = _compressors()
+        for name in set(names):
+            if not name.endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+            # Hashed names change with the content, so an existing sibling is already up to date.
+            pending = {suffix: compress for suffix, compress in compressors.items() if not self.exists(name + suffix)}
+            if not pending:
+                continue
+            with self.open(name) as source:
+                data = source.read()
+            if len(data) < MIN_COMPRESS_SIZE:
+                continue
+            for suffix, compress in pending.items():
+                compressed = compress(data)
+                if len(compressed) < len(data):
+                    self._save(name + suffix, ContentFile(compressed))
@@ -0,0 +1,14 @@
+from django.apps import apps
+
+
+def swagger_auto_schema(**kwargs):
+    """
+    ``drf_yasg.utils.swagger_auto_schema`` that only imports drf_yasg when the
+    docs app is installed, so API-only workers never load it.
+    """
+    if not apps.is_installed('drf_yasg'):
+        return lambda view_method: view_method
+
+    from drf_yasg.utils import swagger_auto_schema as yasg_swagger_auto_schema
+
+    return yasg_swagger_auto_schema(**kwargs)
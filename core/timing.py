@@ -0,0 +1,61 @@
+"""
+Per-request timing sections for ``ServerTimingMiddleware``.
+
+Code that wants to show up in the ``Server-Timing`` header wraps the work in
+``section(name)``. Outside a sampled request the section is a no-op, so the
+calls can stay in hot paths.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+class RequestTimings:
+    """Accumulated durations (ms) and hit counts per section for one request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.sections: dict[str, list] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        entry = self.sections.setdefault(name, [0.0, 0])
+        entry[0] += seconds * 1000
+        entry[1] += 1
+
+    def total_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def db_wrapper(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.add("db", time.perf_counter() - started)
+
+
+_current_timings: ContextVar[RequestTimings | None] = ContextVar("request_timings", default=None)
+
+
+def current_timings() -> RequestTimings | None:
+    return _current_timings.get()
+
+
+def activate(timings: RequestTimings | None):
+    return _current_timings.set(timings)
+
+
+def deactivate(token) -> None:
+    _current_timings.reset(token)
+
+
+@contextmanager
+def section(name: str):
+    timings = _current_timings.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - started)
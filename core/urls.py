@@ -1,28 +1,13 @@
-from django.conf import settings
 from django.contrib import admin
 from django.urls import include, path
-from drf_yasg import openapi
-from drf_yasg.generators import OpenAPISchemaGenerator
 from drf_yasg.views import get_schema_view
 from rest_framework import permissions
 
-from core.views import api_root
-
-class BothHttpAndHttpsSchemaGenerator(OpenAPISchemaGenerator):
-    def get_schema(self, request=None, public=False):
-        schema = super().get_schema(request, public)
-        schema.schemes = ["http", "https"]
-        if settings.DEBUG is False:
-            schema.schemes = ["https", "http"]
-        return schema
-
+from core.openapi import API_INFO, BothHttpAndHttpsSchemaGenerator, schema_document_view
+from core.views import api_root, metrics
 
 schema_view = get_schema_view(
-    openapi.Info(
-        title="Test24 API",
-        default_version="v1",
-        description="Test24 API Documentation",
-    ),
+    API_INFO,
     public=True,
     permission_classes=[permissions.AllowAny],
     generator_class=BothHttpAndHttpsSchemaGenerator,
@@ -30,16 +15,18 @@ schema_view = get_schema_view(
 
 urlpatterns = [
     path('', api_root, name='api-root'),
+    path('metrics', metrics, name='metrics'),
     path('admin/', admin.site.urls),
     path('api/v1/auth/', include('apps.accounts.api.auth.urls')),
+    path('api/v1/analytics/', include('apps.accounts.api.analytics.urls')),
     path(
         "api/v1/docs.json",
-        schema_view.without_ui(cache_timeout=0),
+        schema_document_view("docs.json"),
         name="schema-json",
     ),
     path(
         "api/v1/docs.yaml",
-        schema_view.without_ui(cache_timeout=0),
+        schema_document_view("docs.yaml"),
         name="schema-yaml",
     ),
     path(
@@ -48,4 +35,3 @@ urlpatterns = [
         name="schema-swagger-ui",
     ),
 ]
-
@@ -0,0 +1,10 @@
+from django.urls import include, path
+
+from core.views import api_root, metrics
+
+urlpatterns = [
+    path('', api_root, name='api-root'),
+    path('metrics', metrics, name='metrics'),
+    path('api/v1/auth/', include('apps.accounts.api.auth.urls')),
+    path('api/v1/analytics/', include('apps.accounts.api.analytics.urls')),
+]
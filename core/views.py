@@ -1,5 +1,8 @@
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
 from django.utils.timezone import now
+from django.views.decorators.http import require_safe
+
+from core.metrics import generate_latest
 
 
 def api_root(request):
@@ -18,4 +21,10 @@ def api_root(request):
     )
 
 
-
+@require_safe
+def metrics(request):
+    """
+    Prometheus scrape endpoint, summed over all gunicorn workers.
+    Nginx only lets local scrapers through.
+    """
+    return HttpResponse(generate_latest(), content_type="text/plain; version=0.0.4; charset=utf-8")
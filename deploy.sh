@@ -11,6 +11,7 @@ SERVER_PASSWORD="${SERVER_PASSWORD:-}"
 GIT_TOKEN="${GIT_TOKEN:-}"
 PROJECT_PATH="/opt/test24_backend"
 SERVICE_NAME="test24_backend-backend"
+ADMIN_SERVICE_NAME="test24_backend-admin"
 
 if [ -z "$SERVER_PASSWORD" ] || [ -z "$GIT_TOKEN" ]; then
     echo "❌ Xatolik: SERVER_PASSWORD va GIT_TOKEN environment variable'larini o'rnating"
@@ -50,14 +51,16 @@ sshpass -p "$SERVER_PASSWORD" ssh -o StrictHostKeyChecking=no ${SERVER_USER}@${S
     source venv/bin/activate
     python manage.py migrate --noinput
     python manage.py collectstatic --noinput
+    python manage.py build_openapi_schema
 EOF
 
 # 5. Service restart
 echo "🔄 Service qayta ishga tushirilmoqda..."
 sshpass -p "$SERVER_PASSWORD" ssh -o StrictHostKeyChecking=no ${SERVER_USER}@${SERVER_IP} << EOF
-    systemctl restart ${SERVICE_NAME}
+    systemctl restart ${SERVICE_NAME} ${ADMIN_SERVICE_NAME}
     sleep 2
     systemctl status ${SERVICE_NAME} --no-pager | head -10
+    systemctl status ${ADMIN_SERVICE_NAME} --no-pager | head -5
 EOF
 
 echo "✅ Deploy muvaffaqiyatli yakunlandi!"
@@ -54,7 +54,7 @@ parse_args() {
 apt_packages() {
   export DEBIAN_FRONTEND=noninteractive
   apt-get update
-  apt-get install -y git python3 python3-venv python3-pip nginx postgresql-client curl
+  apt-get install -y git python3 python3-venv python3-pip nginx libnginx-mod-http-brotli-static postgresql-client curl
 }
 
 ensure_user() {
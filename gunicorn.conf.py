@@ -0,0 +1,209 @@
+"""
+Gunicorn configuration for the Test24 backend.
+
+Every knob can be overridden from the environment (see example.env); the
+defaults size the pool from the CPU count. The app is preloaded in the master
+so imported modules, the URLconf and the compiled request validators are
+shared copy-on-write by all workers. Because of that, a HUP reload does not
+pick up new code: deploys must restart the service.
+
+Run with ``gunicorn -c gunicorn.conf.py``.
+"""
+import json
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import wait
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name, "").strip()
+    return int(value) if value else default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name, "").strip().lower()
+    return value in ("1", "true", "yes") if value else default
+
+
+WORKER_CLASSES = {
+    "sync": "sync",
+    "gthread": "gthread",
+    # Requires `pip install uvicorn`; serves the ASGI entry point.
+    "uvicorn": "uvicorn.workers.UvicornWorker",
+}
+WORKER_KIND = os.getenv("GUNICORN_WORKER_CLASS", "gthread").strip()
+if WORKER_KIND not in WORKER_CLASSES:
+    raise RuntimeError(f"GUNICORN_WORKER_CLASS must be one of {', '.join(WORKER_CLASSES)}, got {WORKER_KIND!r}")
+
+CPU_COUNT = multiprocessing.cpu_count()
+DEFAULT_WORKERS = {"sync": CPU_COUNT * 2 + 1, "gthread": CPU_COUNT + 1, "uvicorn": CPU_COUNT}
+DEFAULT_APPS = {
+    "sync": "core.wsgi_api:application",
+    "gthread": "core.wsgi_api:application",
+    "uvicorn": "core.asgi_api:application",
+}
+
+wsgi_app = os.getenv("GUNICORN_APP", DEFAULT_APPS[WORKER_KIND])
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8001")
+worker_class = WORKER_CLASSES[WORKER_KIND]
+workers = _env_int("GUNICORN_WORKERS", DEFAULT_WORKERS[WORKER_KIND])
+threads = _env_int("GUNICORN_THREADS", 4 if WORKER_KIND == "gthread" else 1)
+
+preload_app = _env_bool("GUNICORN_PRELOAD", True)
+max_requests = _env_int("GUNICORN_MAX_REQUESTS", 2000)
+max_requests_jitter = _env_int("GUNICORN_MAX_REQUESTS_JITTER", max_requests // 10)
+timeout = _env_int("GUNICORN_TIMEOUT", 120)
+graceful_timeout = _env_int("GUNICORN_GRACEFUL_TIMEOUT", 30)
+keepalive = _env_int("GUNICORN_KEEPALIVE", 5)
+
+# Request lines come from core.middleware.AccessLogMiddleware through the
+# non-blocking JSON log queue; gunicorn's own access log writes synchronously.
+accesslog = None
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+# Per-worker metric shards (core.metrics); shared by all workers of this master.
+METRICS_DIR = os.getenv("METRICS_DIR", "").strip()
+
+# Resolved by the warm-up so the first real request does not pay for it.
+WARMUP_PATHS = (
+    "/api/v1/auth/request-otp/",
+    "/api/v1/auth/submit-otp/",
+    "/api/v1/auth/login/",
+)
+
+
+def emit(log, event: str, **fields) -> None:
+    """Write a worker lifecycle event as one JSON line to the gunicorn error log."""
+    log.info(json.dumps({"event": event, "ts": round(time.time(), 3), **fields}, separators=(",", ":")))
+
+
+def prime_app() -> None:
+    """Import the URLconf and views (building the compiled validators) and load DRF/JWT settings."""
+    from django.urls import get_resolver, resolve
+    from django.utils.module_loading import import_string
+    from rest_framework.settings import api_settings
+
+    get_resolver().url_patterns
+    for path in WARMUP_PATHS:
+        resolve(path)
+    for setting in (
+        "DEFAULT_PARSER_CLASSES",
+        "DEFAULT_RENDERER_CLASSES",
+        "DEFAULT_AUTHENTICATION_CLASSES",
+        "DEFAULT_PERMISSION_CLASSES",
+    ):
+        getattr(api_settings, setting)
+    import_string("rest_framework_simplejwt.state.token_backend")
+
+
+def warm_db_connections(worker) -> None:
+    """Open the DB connection of every thread that will serve requests in this worker."""
+    from django.db import connection
+
+    # Django connections are per thread. The sync worker serves on the thread that runs
+    # post_worker_init; gthread serves on its pool, which exists by then but has no threads yet.
+    pool = getattr(worker, "tpool", None)
+    if pool is None:
+        connection.ensure_connection()
+        return
+    size = worker.cfg.threads
+    # Each task waits for the others, so the pool starts one thread per task instead of reusing one.
+    barrier = threading.Barrier(size)
+
+    def connect():
+        try:
+            connection.ensure_connection()
+        finally:
+            barrier.wait(timeout)
+
+    for future in wait([pool.submit(connect) for _ in range(size)]).done:
+        future.result()
+
+
+def _django_ready() -> bool:
+    try:
+        from django.apps import apps
+    except ImportError:
+        return False
+    return apps.ready
+
+
+def on_starting(server):
+    if METRICS_DIR:
+        from core.metrics import clear_metrics_dir
+
+        clear_metrics_dir(METRICS_DIR)
+    emit(server.log, "master_starting", worker_class=worker_class, workers=workers, threads=threads)
+
+
+def when_ready(server):
+    if preload_app and _django_ready():
+        started = time.perf_counter()
+        prime_app()
+        emit(server.log, "master_primed", duration_ms=round((time.perf_counter() - started) * 1000, 1))
+    emit(server.log, "master_ready", bind=bind)
+
+
+def on_reload(server):
+    emit(server.log, "master_reload")
+
+
+def pre_fork(server, worker):
+    # Never let a DB socket opened in the master leak into the workers.
+    if _django_ready():
+        from django.db import connections
+
+        connections.close_all()
+
+
+def post_fork(server, worker):
+    emit(server.log, "worker_spawned", worker_pid=worker.pid, age=worker.age)
+
+
+def post_worker_init(worker):
+    started = time.perf_counter()
+    if not preload_app:
+        prime_app()
+    # The uvicorn worker runs sync views on asgiref's executor threads, which do not exist yet.
+    if WORKER_KIND != "uvicorn":
+        try:
+            warm_db_connections(worker)
+        except Exception as exc:
+            # Best effort: failing here would halt the master, while requests can still connect lazily.
+            emit(worker.log, "worker_warmup_failed", worker_pid=worker.pid, error=repr(exc))
+    if _django_ready():
+        from core.profiling import install_signal_handler
+
+        install_signal_handler()
+    emit(worker.log, "worker_ready", worker_pid=worker.pid, warmup_ms=round((time.perf_counter() - started) * 1000, 1))
+
+
+def worker_int(worker):
+    emit(worker.log, "worker_interrupted", worker_pid=worker.pid)
+
+
+def worker_abort(worker):
+    emit(worker.log, "worker_aborted", worker_pid=worker.pid, timeout=timeout)
+
+
+def worker_exit(server, worker):
+    emit(server.log, "worker_exited", worker_pid=worker.pid, requests=getattr(worker, "nr", None))
+
+
+def child_exit(server, worker):
+    if METRICS_DIR:
+        from core.metrics import merge_dead_process
+
+        merge_dead_process(METRICS_DIR, worker.pid)
+    emit(server.log, "worker_reaped", worker_pid=worker.pid)
+
+
+def nworkers_changed(server, new_value, old_value):
+    emit(server.log, "workers_changed", workers=new_value, previous=old_value)
+
+
+def on_exit(server):
+    emit(server.log, "master_exiting")
@@ -0,0 +1,142 @@
+from datetime import timedelta
+from unittest import mock, skipUnless
+
+from django.contrib import messages
+from django.contrib.auth import get_user_model
+from django.contrib.messages import get_messages
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.accounts.admin import OTPVerificationSessionAdmin
+from apps.accounts.models import OTPVerificationSession
+from core.changelist import EstimatedCountPaginator, estimate_count
+
+
+class ScalableChangelistTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = get_user_model().objects.create_superuser("+998900000001", "admin-pass")
+        now = timezone.now()
+        cls.sessions = []
+        for index in range(5):
+            session = OTPVerificationSession.objects.create(
+                address=f"+99890123450{index}", otp_code="1234", expires_at=now + timedelta(minutes=5)
+            )
+            OTPVerificationSession.objects.filter(id=session.id).update(created_at=now - timedelta(minutes=index))
+            cls.sessions.append(session)
+
+    def setUp(self):
+        self.client.force_login(self.admin_user)
+        self.url = reverse("admin:accounts_otpverificationsession_changelist")
+
+    def _ids(self, response):
+        return [session.id for session in response.context["cl"].result_list]
+
+    def test_keyset_pages_walk_newest_first_without_offsets(self):
+        expected = [session.id for session in self.sessions]
+        seen = []
+        url = self.url
+        with mock.patch.object(OTPVerificationSessionAdmin, "list_per_page", 2):
+            while url:
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                cl = response.context["cl"]
+                self.assertTrue(cl.keyset)
+                seen += self._ids(response)
+                url = cl.next_page_url and self.url + cl.next_page_url
+
+        self.assertEqual(seen, expected)
+        self.assertContains(response, "First page")
+
+    def test_sorting_by_a_column_falls_back_to_numbered_pages(self):
+        response = self.client.get(self.url, {"o": "1"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.context["cl"].keyset)
+
+    def test_search_matches_exact_uuid(self):
+        response = self.client.get(self.url, {"q": str(self.sessions[2].id)})
+
+        self.assertEqual(self._ids(response), [self.sessions[2].id])
+
+    def test_search_matches_address_prefix_with_or_without_plus(self):
+        for term in ("+998901234503", "998901234503"):
+            with self.subTest(term=term):
+                response = self.client.get(self.url, {"q": term})
+                self.assertEqual(self._ids(response), [self.sessions[3].id])
+
+        response = self.client.get(self.url, {"q": "+9989012345"})
+        self.assertEqual(len(self._ids(response)), 5)
+
+    def test_other_search_terms_match_nothing_with_a_warning(self):
+        for term in ("Ali", "+998 90", "ali@x"):
+            with self.subTest(term=term):
+                response = self.client.get(self.url, {"q": term})
+
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(self._ids(response), [])
+                [message] = get_messages(response.wsgi_request)
+                self.assertEqual(message.level, messages.WARNING)
+                self.assertIn("ID (UUID) or the start of a phone number", message.message)
+                self.assertNotIn("name", message.message)
+
+    def test_unsupported_search_on_postgresql_is_counted_without_sql(self):
+        # The count goes through the planner path, which cannot compile a query that matches nothing.
+        postgresql = mock.MagicMock(vendor="postgresql")
+        with mock.patch("core.changelist.connections", {"default": postgresql}):
+            response = self.client.get(self.url, {"q": "Ali"})
+            self.assertEqual(estimate_count(OTPVerificationSession.objects.filter(pk__in=[])), 0)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["cl"].result_count, 0)
+        postgresql.cursor.return_value.__enter__.return_value.execute.assert_not_called()
+
+    def test_date_filter_is_a_plain_range_without_distinct_dates(self):
+        today = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+
+        with CaptureQueriesContext(connection) as queries:
+            # The "Today" link of the created_at list filter.
+            response = self.client.get(
+                self.url, {"created_at__gte": str(today), "created_at__lt": str(today + timedelta(days=1))}
+            )
+
+        self.assertEqual(response.status_code, 200)
+        # A plain range on the indexed column, and no SELECT DISTINCT over the table for a date drill-down.
+        self.assertIn('."created_at" >= ', str(response.context["cl"].queryset.query))
+        self.assertFalse(any("DISTINCT" in query["sql"] for query in queries))
+
+    def test_user_changelist_uses_keyset_pages(self):
+        response = self.client.get(reverse("admin:accounts_user_changelist"), {"q": "+99890000"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context["cl"].keyset)
+        self.assertEqual([user.pk for user in response.context["cl"].result_list], [self.admin_user.pk])
+
+    def test_user_search_matches_name_prefix(self):
+        get_user_model().objects.create_user(phone_number="+998900000002", first_name="Alisher", last_name="Navoiy")
+        url = reverse("admin:accounts_user_changelist")
+
+        for term in ("Ali", "ali", "Navo"):
+            with self.subTest(term=term):
+                response = self.client.get(url, {"q": term})
+                self.assertEqual([user.first_name for user in response.context["cl"].result_list], ["Alisher"])
+
+    def test_small_tables_are_counted_exactly(self):
+        paginator = EstimatedCountPaginator(OTPVerificationSession.objects.all(), 2)
+
+        self.assertEqual(paginator.count, 5)
+        self.assertFalse(paginator.is_estimate)
+
+    @skipUnless(connection.vendor == "postgresql", "planner statistics are PostgreSQL-specific")
+    def test_large_tables_are_estimated_from_statistics(self):
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE accounts_otpverificationsession")
+        self.assertEqual(estimate_count(OTPVerificationSession.objects.all()), 5)
+
+        with mock.patch.object(EstimatedCountPaginator, "exact_count_threshold", 1):
+            paginator = EstimatedCountPaginator(OTPVerificationSession.objects.filter(is_verified=False), 2)
+            self.assertGreater(paginator.count, 0)
+            self.assertTrue(paginator.is_estimate)
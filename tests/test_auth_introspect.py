@@ -0,0 +1,78 @@
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from apps.accounts.models import User
+
+
+@override_settings(INTERNAL_API_TOKEN="internal-secret")
+class TokenIntrospectAPITests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('auth-introspect')
+        self.user = User.objects.create_user(phone_number="+998901234567")
+        self.client.credentials(HTTP_X_INTERNAL_TOKEN="internal-secret")
+
+    def _access_token(self, user=None) -> str:
+        return str(RefreshToken.for_user(user or self.user).access_token)
+
+    def test_introspect_returns_results_in_request_order(self):
+        other = User.objects.create_user(phone_number="+998901234568")
+        tokens = [self._access_token(), "garbage", self._access_token(other)]
+
+        response = self.client.post(self.url, {"tokens": tokens}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data["results"]
+        self.assertEqual(len(results), 3)
+        self.assertTrue(results[0]["active"])
+        self.assertEqual(results[0]["user_id"], str(self.user.id))
+        self.assertEqual(results[0]["claims"]["token_type"], "access")
+        self.assertFalse(results[1]["active"])
+        self.assertIn("error", results[1])
+        self.assertEqual(results[2]["user_id"], str(other.id))
+
+    def test_introspect_resolves_users_with_single_query(self):
+        users = [User.objects.create_user(phone_number=f"+99890000000{i}") for i in range(5)]
+        tokens = [self._access_token(user) for user in users]
+
+        with self.assertNumQueries(1):
+            response = self.client.post(self.url, {"tokens": tokens}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(all(result["active"] for result in response.data["results"]))
+
+    def test_introspect_serves_repeated_tokens_from_cache(self):
+        token = self._access_token()
+        self.client.post(self.url, {"tokens": [token]}, format='json')
+
+        with self.assertNumQueries(0):
+            response = self.client.post(self.url, {"tokens": [token, token]}, format='json')
+
+        self.assertEqual([result["active"] for result in response.data["results"]], [True, True])
+
+    def test_introspect_rejects_inactive_user(self):
+        token = self._access_token()
+        User.objects.filter(id=self.user.id).update(is_active=False)
+
+        response = self.client.post(self.url, {"tokens": [token]}, format='json')
+
+        self.assertFalse(response.data["results"][0]["active"])
+
+    def test_introspect_rejects_refresh_tokens(self):
+        response = self.client.post(self.url, {"tokens": [str(RefreshToken.for_user(self.user))]}, format='json')
+
+        self.assertFalse(response.data["results"][0]["active"])
+
+    def test_introspect_requires_internal_token(self):
+        self.client.credentials(HTTP_X_INTERNAL_TOKEN="wrong")
+        response = self.client.post(self.url, {"tokens": [str(AccessToken.for_user(self.user))]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_introspect_validates_batch_size(self):
+        response = self.client.post(self.url, {"tokens": []}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("tokens", response.data)
@@ -1,7 +1,14 @@
+import threading
+import time
+from unittest import mock
+
+from django.db import connection
+from django.test import TransactionTestCase
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
 
+from apps.accounts.api.auth.views import MockSMSService, otp_service
 from apps.accounts.models import OTPVerificationSession
 
 
@@ -40,3 +47,48 @@ class RequestOtpAPITests(APITestCase):
 
 
 
+
+
+class CountingSMSService(MockSMSService):
+    def __init__(self):
+        self.sent = []
+
+    def send_otp(self, phone_number: str, otp_code: str) -> None:
+        self.sent.append(phone_number)
+
+
+class ConcurrentRequestOtpTests(TransactionTestCase):
+    def test_concurrent_requests_share_one_session_and_sms(self):
+        sms = CountingSMSService()
+        barrier = threading.Barrier(6)
+        results = []
+        lookup = otp_service._get_active_session
+
+        def slow_lookup(address):
+            # Widen the read-then-write window so unguarded callers would all miss each other.
+            session = lookup(address)
+            time.sleep(0.05)
+            return session
+
+        def request_code():
+            try:
+                barrier.wait()
+                session, throttled, retry_after = otp_service.issue_code("+998901234567")
+                results.append((session.id, throttled, retry_after))
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=request_code) for _ in range(barrier.parties)]
+        with mock.patch.object(otp_service, "sms_client", sms), \
+                mock.patch.object(otp_service, "_get_active_session", slow_lookup):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(len(results), barrier.parties)
+        self.assertEqual(len({session_id for session_id, _, _ in results}), 1)
+        self.assertEqual(sorted(throttled for _, throttled, _ in results), [False] + [True] * 5)
+        self.assertTrue(all(retry_after > 0 for _, throttled, retry_after in results if throttled))
+        self.assertEqual(OTPVerificationSession.objects.count(), 1)
+        self.assertEqual(sms.sent, ["+998901234567"])
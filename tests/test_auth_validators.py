@@ -0,0 +1,112 @@
+import uuid
+from io import BytesIO
+
+from django.http import QueryDict
+from django.test import SimpleTestCase
+from rest_framework.exceptions import ParseError, ValidationError
+from rest_framework.renderers import JSONRenderer
+
+from apps.accounts.api.auth.serializers import LoginSerializer, RequestOtpSerializer, SubmitOtpSerializer
+from apps.accounts.api.auth.validators import validate_login, validate_request_otp, validate_submit_otp
+from core.parsers import ORJSONParser
+from core.renderers import ORJSONRenderer
+
+SESSION_ID = str(uuid.uuid4())
+
+REQUEST_OTP_PAYLOADS = [
+    {"address": "+998901234567"},
+    {"address": " +998901234567 ", "client_secret": "abc"},
+    {"address": "+998901234567", "client_secret": None},
+    {"address": "12345"},
+    {"address": "+99890123456789012"},
+    {"address": ""},
+    {"address": None},
+    {"address": 998901234567},
+    {"address": True},
+    {"address": ["+998901234567"]},
+    {"address": "+998\x0090123456"},
+    {},
+    [],
+    "address",
+    None,
+    QueryDict("address=%2B998901234567"),
+    QueryDict("address="),
+]
+
+SUBMIT_OTP_PAYLOADS = [
+    {"session": SESSION_ID, "otp": "1234"},
+    {"session": SESSION_ID.replace("-", ""), "otp": "1234", "client_secret": ""},
+    {"session": "not-a-uuid", "otp": "12a4"},
+    {"session": 42, "otp": 1234},
+    {"session": SESSION_ID, "otp": "123"},
+    {"session": SESSION_ID, "otp": "12345"},
+    {"session": SESSION_ID, "otp": "  "},
+    {"session": {}, "otp": []},
+    {"otp": "1234"},
+    {},
+]
+
+LOGIN_PAYLOADS = [
+    {"verification_data": {"session": SESSION_ID}},
+    {
+        "verification_data": {"session": SESSION_ID, "client_secret": "s"},
+        "session_data": {"platform": "ANDROID", "device_os": "14", "device_model": "Pixel", "theme": ""},
+        "referral_code": "REF",
+    },
+    {"verification_data": {"session": SESSION_ID}, "session_data": {}},
+    {"verification_data": {"session": SESSION_ID}, "session_data": None},
+    {"verification_data": {"session": SESSION_ID}, "session_data": "ANDROID"},
+    {"verification_data": {"session": SESSION_ID}, "session_data": {"platform": "SYMBIAN", "lang": 5}},
+    {"verification_data": {"session": SESSION_ID}, "session_data": {"platform": ""}},
+    {"verification_data": {"session": "bad"}, "session_data": {"device_os": {}}},
+    {"verification_data": [SESSION_ID]},
+    {"verification_data": None, "referral_code": None},
+    {"session_data": {"platform": "IOS"}},
+    {},
+]
+
+
+class CompiledValidatorParityTests(SimpleTestCase):
+    def _assert_parity(self, validator, serializer_class, payloads):
+        for payload in payloads:
+            with self.subTest(payload=payload):
+                serializer = serializer_class(data=payload)
+                try:
+                    validated = validator(payload)
+                except ValidationError as exc:
+                    self.assertFalse(serializer.is_valid())
+                    self.assertEqual(exc.detail, serializer.errors)
+                else:
+                    self.assertTrue(serializer.is_valid(), serializer.errors)
+                    self.assertEqual(validated, serializer.validated_data)
+
+    def test_request_otp_matches_serializer(self):
+        self._assert_parity(validate_request_otp, RequestOtpSerializer, REQUEST_OTP_PAYLOADS)
+
+    def test_submit_otp_matches_serializer(self):
+        self._assert_parity(validate_submit_otp, SubmitOtpSerializer, SUBMIT_OTP_PAYLOADS)
+
+    def test_login_matches_serializer(self):
+        self._assert_parity(validate_login, LoginSerializer, LOGIN_PAYLOADS)
+
+
+class ORJSONCodecTests(SimpleTestCase):
+    def test_renderer_matches_drf_output(self):
+        data = {
+            "session": uuid.UUID(SESSION_ID),
+            "retry_after": 0,
+            "detail": "line\u2028separator, paragraph\u2029separator, Oʻzbekcha",
+            "errors": ValidationError({"otp": ["OTP is incorrect."]}).detail,
+        }
+        rendered = ORJSONRenderer().render(data)
+        self.assertEqual(rendered, JSONRenderer().render(data))
+        # Escaped like DRF's strict-javascript-subset output, never sent as raw U+2028/U+2029.
+        self.assertIn(b"line\\u2028separator, paragraph\\u2029separator", rendered)
+        self.assertNotIn("\u2028".encode(), rendered)
+        self.assertNotIn("\u2029".encode(), rendered)
+
+    def test_parser_rejects_malformed_json(self):
+        parser = ORJSONParser()
+        self.assertEqual(parser.parse(BytesIO(b'{"address": "+998901234567"}')), {"address": "+998901234567"})
+        with self.assertRaises(ParseError):
+            parser.parse(BytesIO(b'{"address": '))
@@ -0,0 +1,76 @@
+import tempfile
+from pathlib import Path
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.accounts.management.commands.bench_otp_orm import (
+    _sample_ids,
+    build_operations,
+    find_regressions,
+    run_operations,
+    seed,
+)
+from apps.accounts.models import OTPVerificationSession, User
+
+
+class SeedAndRunTests(TestCase):
+    def test_seed_grows_tables_incrementally(self):
+        seed(400)
+        seed(800)
+
+        self.assertEqual(OTPVerificationSession.objects.count(), 800)
+        self.assertEqual(User.objects.count(), 200)
+        consumed = OTPVerificationSession.objects.filter(consumed_at__isnull=False).count()
+        self.assertTrue(400 < consumed < 650)
+
+    def test_operations_are_timed_explained_and_rolled_back(self):
+        seed(300)
+        session_ids = list(OTPVerificationSession.objects.values_list("id", flat=True)[:20])
+        explain_dir = Path(tempfile.mkdtemp())
+        snapshot = list(OTPVerificationSession.objects.order_by("id").values_list())
+
+        results = run_operations(build_operations(100, session_ids), iterations=3, explain_dir=explain_dir)
+
+        self.assertEqual(results["get_session_or_404"]["queries"], 1)
+        self.assertGreater(results["view_login"]["median_ms"], 0)
+        self.assertIn("accounts_otpverificationsession", (explain_dir / "get_active_session.txt").read_text())
+        self.assertEqual(list(OTPVerificationSession.objects.order_by("id").values_list()), snapshot)
+        self.assertEqual(User.objects.count(), 75)
+
+
+    def test_sample_ids_seek_the_primary_key_instead_of_sorting_randomly(self):
+        seed(300)
+
+        with CaptureQueriesContext(connection) as queries:
+            ids = _sample_ids(50)
+
+        self.assertEqual(len(set(ids)), 50)
+        self.assertEqual(OTPVerificationSession.objects.filter(id__in=ids).count(), 50)
+        self.assertFalse(any("RAND" in query["sql"].upper() for query in queries))
+
+
+class FindRegressionsTests(SimpleTestCase):
+    baseline = {"10000": {"issue_code": {"median_ms": 1.0, "p95_ms": 2.0, "queries": 2}}}
+
+    def _current(self, median_ms, queries=2):
+        return {"10000": {"issue_code": {"median_ms": median_ms, "p95_ms": 0, "queries": queries}}}
+
+    def test_within_tolerance_passes(self):
+        self.assertEqual(find_regressions(self._current(1.2), self.baseline, tolerance=0.25, floor_ms=0.1), [])
+
+    def test_slowdown_past_tolerance_and_floor_fails(self):
+        self.assertEqual(len(find_regressions(self._current(1.5), self.baseline, tolerance=0.25, floor_ms=0.1)), 1)
+        self.assertEqual(find_regressions(self._current(1.5), self.baseline, tolerance=0.25, floor_ms=1.0), [])
+
+    def test_extra_query_fails(self):
+        regressions = find_regressions(self._current(1.0, queries=3), self.baseline, tolerance=0.25, floor_ms=0.1)
+        self.assertEqual(regressions, ["10000 issue_code: 2 -> 3 queries"])
+
+    def test_missing_baseline_fails_unless_saving_one(self):
+        missing = Path(tempfile.mkdtemp()) / "baseline.json"
+
+        with self.assertRaisesMessage(CommandError, "--save-baseline"):
+            call_command("bench_otp_orm", "--baseline", str(missing))
@@ -0,0 +1,101 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from apps.accounts.models import DeviceProfile, OTPVerificationSession
+
+ANDROID = {"platform": "ANDROID", "device_os": "14", "device_model": "Pixel 8", "app_version": "2.4.1", "lang": "uz"}
+
+
+def _session(**fields) -> OTPVerificationSession:
+    return OTPVerificationSession.objects.create(
+        address="+998901234567",
+        otp_code="1234",
+        expires_at=timezone.now() + OTPVerificationSession.OTP_TTL,
+        **fields,
+    )
+
+
+class DeviceProfileInterningTests(TestCase):
+    def setUp(self):
+        DeviceProfile.objects.clear_cache()
+        self.addCleanup(DeviceProfile.objects.clear_cache)
+
+    def test_same_values_share_one_profile(self):
+        first = DeviceProfile.objects.intern(ANDROID)
+        second = DeviceProfile.objects.intern(dict(reversed(list(ANDROID.items()))))
+        other = DeviceProfile.objects.intern({**ANDROID, "theme": "dark"})
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+        self.assertEqual(DeviceProfile.objects.count(), 2)
+
+    def test_empty_session_data_has_no_profile(self):
+        self.assertIsNone(DeviceProfile.objects.intern({}))
+        self.assertIsNone(DeviceProfile.objects.intern({"platform": "", "lang": None}))
+
+    def test_known_profiles_cost_no_query_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            profile_id = DeviceProfile.objects.intern(ANDROID)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(DeviceProfile.objects.intern(ANDROID), profile_id)
+        self.assertEqual(len(queries), 0)
+
+    def test_uncommitted_profiles_are_not_cached(self):
+        with self.captureOnCommitCallbacks(execute=False):
+            DeviceProfile.objects.intern(ANDROID)
+
+        self.assertEqual(DeviceProfile.objects._ids, {})
+
+
+class LoginMetadataTests(TestCase):
+    def test_consume_splits_payload_into_profile_and_per_login_columns(self):
+        session = _session()
+
+        session.consume({"session_data": {**ANDROID, "mac_address": "aa:bb:cc"}, "referral_code": "REF42"})
+        session.refresh_from_db()
+
+        self.assertEqual(session.session_data, {})
+        self.assertEqual(session.mac_address, "aa:bb:cc")
+        self.assertEqual(session.referral_code, "REF42")
+        self.assertEqual(session.device_profile.device_model, "Pixel 8")
+        self.assertEqual(
+            session.login_metadata,
+            {"session_data": {**ANDROID, "mac_address": "aa:bb:cc"}, "referral_code": "REF42"},
+        )
+
+    def test_legacy_json_is_returned_unchanged(self):
+        legacy = {"session_data": {"platform": "IOS", "lang": "ru"}, "referral_code": None}
+        session = _session(consumed_at=timezone.now(), session_data=legacy)
+
+        self.assertEqual(session.login_metadata, legacy)
+
+    def test_consume_without_metadata(self):
+        session = _session()
+
+        session.consume({"session_data": {}})
+        session.refresh_from_db()
+
+        self.assertIsNone(session.device_profile_id)
+        self.assertEqual(session.login_metadata, {"session_data": {}, "referral_code": None})
+
+
+class LoginStoresDeviceProfileTests(APITestCase):
+    def test_logins_from_the_same_device_type_share_a_profile(self):
+        for phone in ("+998901234567", "+998901234568"):
+            session = _session(is_verified=True, verified_at=timezone.now())
+            OTPVerificationSession.objects.filter(id=session.id).update(address=phone)
+            response = self.client.post(
+                reverse('auth-login'),
+                {"verification_data": {"session": str(session.id)}, "session_data": ANDROID},
+                format='json',
+            )
+            self.assertEqual(response.status_code, 200)
+
+        profiles = set(OTPVerificationSession.objects.values_list("device_profile_id", flat=True))
+        self.assertEqual(len(profiles), 1)
+        self.assertEqual(DeviceProfile.objects.count(), 1)
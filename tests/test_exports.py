@@ -0,0 +1,130 @@
+import csv
+import gzip
+import io
+import os
+import tempfile
+from datetime import timedelta
+
+import orjson
+from django.contrib.admin import helpers
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.accounts import exports
+from apps.accounts.models import DeviceProfile, OTPVerificationSession, User
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = User.objects.create_superuser("+998900000001", "admin-pass")
+        now = timezone.now()
+        cls.sessions = []
+        for index in range(3):
+            session = OTPVerificationSession.objects.create(
+                address=f"+99890123450{index}",
+                otp_code="1234",
+                client_secret="s3cret",
+                expires_at=now + timedelta(minutes=5),
+            )
+            OTPVerificationSession.objects.filter(id=session.id).update(created_at=now - timedelta(days=index))
+            cls.sessions.append(session)
+
+    def setUp(self):
+        DeviceProfile.objects.clear_cache()
+        self.addCleanup(DeviceProfile.objects.clear_cache)
+
+    def _csv_rows(self, content: bytes) -> list[dict]:
+        return list(csv.DictReader(io.StringIO(content.decode())))
+
+    def test_csv_streams_header_before_querying(self):
+        chunks = exports.export_chunks(exports.export_queryset(OTPVerificationSession.objects.all()), chunk_size=2)
+
+        with CaptureQueriesContext(connection) as queries:
+            header = next(chunks)
+        self.assertEqual(len(queries), 0)
+
+        content = header + b"".join(chunks)
+        rows = self._csv_rows(content)
+        self.assertEqual([row["id"] for row in rows], [str(session.id) for session in reversed(self.sessions)])
+        self.assertNotIn("otp_code", rows[0])
+        self.assertNotIn("client_secret", rows[0])
+        self.assertNotIn(b"s3cret", content)
+
+    def test_jsonl_includes_device_profile_columns(self):
+        self.sessions[0].consume({"session_data": {"platform": "ANDROID", "app_version": "2.4.1"}})
+
+        content = b"".join(exports.export_chunks(OTPVerificationSession.objects.filter(consumed_at__isnull=False), "jsonl"))
+
+        [row] = [orjson.loads(line) for line in content.splitlines()]
+        self.assertEqual(row["id"], str(self.sessions[0].id))
+        self.assertEqual(row["platform"], "ANDROID")
+        self.assertEqual(row["app_version"], "2.4.1")
+
+    def test_gzip_output_decompresses_to_the_plain_export(self):
+        queryset = exports.export_queryset(User.objects.all())
+
+        compressed = b"".join(exports.export_chunks(queryset, "csv", compress=True))
+
+        self.assertEqual(gzip.decompress(compressed), b"".join(exports.export_chunks(queryset, "csv")))
+        self.assertNotIn("password", self._csv_rows(gzip.decompress(compressed))[0])
+
+    def test_admin_action_streams_the_selected_rows(self):
+        self.client.force_login(self.admin_user)
+
+        response = self.client.post(
+            reverse("admin:accounts_otpverificationsession_changelist"),
+            {"action": "export_csv_gzip", helpers.ACTION_CHECKBOX_NAME: [str(self.sessions[1].id)]},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        self.assertRegex(response["Content-Disposition"], r'filename="otp_sessions-\d{8}-\d{6}\.csv\.gz"')
+        rows = self._csv_rows(gzip.decompress(b"".join(response.streaming_content)))
+        self.assertEqual([row["id"] for row in rows], [str(self.sessions[1].id)])
+
+    def test_command_exports_a_date_range(self):
+        today = timezone.localdate()
+        handle, path = tempfile.mkstemp(suffix=".jsonl")
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+
+        call_command(
+            "export_accounts", "otp_sessions", "--format", "jsonl", "--start", str(today - timedelta(days=1)),
+            "--end", str(today), "--output", path, stderr=io.StringIO(),
+        )
+
+        with open(path, "rb") as stream:
+            ids = [orjson.loads(line)["id"] for line in stream]
+        self.assertEqual(ids, [str(self.sessions[1].id), str(self.sessions[0].id)])
+
+
+class ExportCursorTests(TransactionTestCase):
+    def setUp(self):
+        for index in range(3):
+            OTPVerificationSession.objects.create(
+                address=f"+99890123450{index}", otp_code="1234", expires_at=timezone.now() + timedelta(minutes=5)
+            )
+
+    def test_rows_are_read_inside_a_transaction(self):
+        # Outside one, PostgreSQL would hold the cursor and spool every row before the first FETCH.
+        chunks = exports.export_chunks(exports.export_queryset(OTPVerificationSession.objects.all()), chunk_size=1)
+
+        next(chunks)
+        self.assertFalse(connection.in_atomic_block)
+        next(chunks)
+        self.assertTrue(connection.in_atomic_block)
+
+        chunks.close()
+        self.assertFalse(connection.in_atomic_block)
+
+    def test_transaction_ends_with_the_export(self):
+        rows = b"".join(exports.export_chunks(exports.export_queryset(OTPVerificationSession.objects.all()), "jsonl"))
+
+        self.assertEqual(len(rows.splitlines()), 3)
+        self.assertFalse(connection.in_atomic_block)
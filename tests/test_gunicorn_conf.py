@@ -0,0 +1,44 @@
+import json
+import runpy
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+from django.conf import settings
+from django.db import OperationalError
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.test import SimpleTestCase
+
+CONFIG = Path(settings.BASE_DIR) / "gunicorn.conf.py"
+
+
+class PostWorkerInitTests(SimpleTestCase):
+    def setUp(self):
+        self.config = runpy.run_path(str(CONFIG))
+        self.enterContext(mock.patch("core.profiling.install_signal_handler"))
+        self.enterContext(
+            mock.patch.object(BaseDatabaseWrapper, "ensure_connection", side_effect=OperationalError("db is down"))
+        )
+
+    def _events(self, worker) -> list[dict]:
+        return [json.loads(call.args[0]) for call in worker.log.info.call_args_list]
+
+    def _boot(self, **attrs):
+        worker = SimpleNamespace(pid=1234, log=mock.Mock(), **attrs)
+        self.config["post_worker_init"](worker)
+        return self._events(worker)
+
+    def test_sync_worker_boots_when_the_database_is_unreachable(self):
+        events = self._boot()
+
+        self.assertEqual([event["event"] for event in events], ["worker_warmup_failed", "worker_ready"])
+        self.assertIn("db is down", events[0]["error"])
+
+    def test_gthread_worker_boots_when_the_database_is_unreachable(self):
+        pool = ThreadPoolExecutor(max_workers=2)
+        self.addCleanup(pool.shutdown)
+
+        events = self._boot(tpool=pool, cfg=SimpleNamespace(threads=2))
+
+        self.assertEqual([event["event"] for event in events], ["worker_warmup_failed", "worker_ready"])
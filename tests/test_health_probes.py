@@ -0,0 +1,47 @@
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from core.health import ReadinessProbe, readiness_probe
+
+
+class HealthProbeTests(TestCase):
+    def setUp(self):
+        readiness_probe._checked_at = float("-inf")
+
+    @override_settings(ALLOWED_HOSTS=[])
+    def test_liveness_is_static_and_skips_host_validation(self):
+        with self.assertNumQueries(0):
+            response = self.client.get("/healthz")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'{"status":"ok"}')
+
+    def test_readiness_reports_every_check(self):
+        response = self.client.get("/readyz")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {
+            "status": "ok",
+            "checks": {"database": "ok", "sms": "ok", "cache": "ok"},
+        })
+
+    def test_readiness_fails_when_a_dependency_is_down(self):
+        with mock.patch("apps.accounts.api.auth.views.otp_service.sms_client.ping", side_effect=ConnectionError):
+            response = self.client.get("/readyz")
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()["status"], "fail")
+        self.assertEqual(response.json()["checks"]["sms"], "error: ConnectionError")
+
+    @override_settings(READINESS_CACHE_SECONDS=60)
+    def test_readiness_results_are_cached(self):
+        check = mock.Mock()
+        probe = ReadinessProbe({"stub": check})
+
+        probe.status()
+        ready, checks = probe.status()
+
+        self.assertTrue(ready)
+        self.assertEqual(checks, {"stub": "ok"})
+        check.assert_called_once_with()
@@ -0,0 +1,25 @@
+from django.test import Client, TestCase
+from django.urls import reverse
+
+
+class BrowserOnlyMiddlewareTests(TestCase):
+    def test_api_paths_skip_browser_middleware(self):
+        response = self.client.post(reverse('auth-request-otp'), {"address": "12345"}, content_type="application/json")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(hasattr(response.wsgi_request, "session"))
+        self.assertFalse(hasattr(response.wsgi_request, "_messages"))
+        self.assertNotIn("Cookie", response.get("Vary", ""))
+
+    def test_admin_keeps_auth_and_session_middleware(self):
+        response = self.client.get("/admin/")
+
+        self.assertEqual(response.status_code, 302)
+        self.assertIn("/admin/login/", response["Location"])
+        self.assertTrue(hasattr(response.wsgi_request, "session"))
+        self.assertFalse(response.wsgi_request.user.is_authenticated)
+
+    def test_admin_still_enforces_csrf(self):
+        client = Client(enforce_csrf_checks=True)
+        response = client.post("/admin/login/", {"username": "+998901234567", "password": "x"})
+        self.assertEqual(response.status_code, 403)
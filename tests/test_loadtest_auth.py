@@ -0,0 +1,85 @@
+import json
+import socket
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.servers.basehttp import WSGIServer
+from django.test import LiveServerTestCase, SimpleTestCase
+from django.test.testcases import LiveServerThread, QuietWSGIRequestHandler
+
+from apps.accounts.api.auth.views import SinkSMSService, otp_service
+from apps.accounts.management.commands.loadtest_auth import percentile
+from apps.accounts.models import OTPVerificationSession
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class PercentileTests(SimpleTestCase):
+    def test_nearest_rank(self):
+        values = [float(value) for value in range(1, 101)]
+
+        self.assertEqual(percentile(values, 0.50), 50)
+        self.assertEqual(percentile(values, 0.99), 99)
+        self.assertEqual(percentile([7.0], 0.95), 7)
+        self.assertEqual(percentile([], 0.95), 0)
+
+
+class SerialLiveServerThread(LiveServerThread):
+    # The in-memory SQLite test database is one connection shared with the
+    # server thread; serve requests one at a time (the client stays concurrent).
+    def _create_server(self, connections_override=None):
+        return WSGIServer((self.host, self.port), QuietWSGIRequestHandler, allow_reuse_address=False)
+
+
+class LoadTestAuthTests(LiveServerTestCase):
+    server_thread_class = SerialLiveServerThread
+
+    def setUp(self):
+        self.output = Path(tempfile.mkdtemp()) / "results.json"
+
+    def _run(self, *args) -> dict:
+        call_command("loadtest_auth", "--base-url", self.live_server_url, "--output", str(self.output), *args, stdout=StringIO())
+        return json.loads(self.output.read_text())
+
+    def test_test_phone_flows_complete(self):
+        results = self._run("--flows", "3", "--concurrency", "1", "--label", "local")
+
+        self.assertEqual(results["flows"], {"completed": 3})
+        self.assertEqual(results["label"], "local")
+        for endpoint in ("request-otp", "submit-otp", "login"):
+            self.assertEqual(results["endpoints"][endpoint]["requests"], 3)
+            self.assertEqual(results["endpoints"][endpoint]["errors"], 0)
+            self.assertGreater(results["endpoints"][endpoint]["p99_ms"], 0)
+
+    def test_sms_sink_flows_run_concurrently_and_replay(self):
+        port = free_port()
+        flows = Path(tempfile.mkdtemp()) / "flows.jsonl"
+
+        with mock.patch.object(otp_service, "sms_client", SinkSMSService(f"http://127.0.0.1:{port}/")):
+            results = self._run(
+                "--flows", "6", "--concurrency", "3", "--sms-sink", f"127.0.0.1:{port}", "--save-flows", str(flows)
+            )
+            self.assertEqual(results["flows"], {"completed": 6})
+            self.assertEqual(OTPVerificationSession.objects.filter(consumed_at__isnull=False).count(), 6)
+
+            replayed = self._run("--replay", str(flows), "--concurrency", "3", "--sms-sink", f"127.0.0.1:{port}")
+
+        self.assertEqual(len(flows.read_text().splitlines()), 6)
+        self.assertEqual(replayed["flows"], {"completed": 6})
+
+    def test_test_phone_mode_runs_one_flow_at_a_time_by_default(self):
+        results = self._run("--flows", "2")
+
+        self.assertEqual(results["concurrency"], 1)
+        self.assertEqual(results["flows"], {"completed": 2})
+
+    def test_test_phone_mode_rejects_concurrency(self):
+        with self.assertRaisesMessage(Exception, "--concurrency 1"):
+            self._run("--concurrency", "4")
@@ -0,0 +1,105 @@
+import threading
+from unittest import mock, skipUnless
+
+from django.db import connection
+from django.test import SimpleTestCase, TransactionTestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.locks import LockTimeout, advisory_lock_id, single_flight
+
+
+class SingleFlightTests(TransactionTestCase):
+    def _hold_in_thread(self, key: str):
+        """Hold ``key`` from another thread (its own DB connection) until the returned event is set."""
+        acquired, release = threading.Event(), threading.Event()
+
+        def hold():
+            try:
+                with single_flight(key):
+                    acquired.set()
+                    release.wait(5)
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=hold)
+        thread.start()
+        self.assertTrue(acquired.wait(5))
+
+        def stop():
+            release.set()
+            thread.join()
+
+        self.addCleanup(stop)
+        return stop
+
+    def test_waiter_times_out_while_the_key_is_held(self):
+        release = self._hold_in_thread("test:busy")
+
+        with self.assertRaises(LockTimeout):
+            with single_flight("test:busy", timeout=0.1):
+                pass
+
+        release()
+        with single_flight("test:busy", timeout=1):
+            pass
+
+    def test_other_keys_are_not_blocked(self):
+        self._hold_in_thread("test:one")
+
+        with single_flight("test:two", timeout=0.1):
+            pass
+
+    @skipUnless(connection.vendor == "postgresql", "advisory locks are PostgreSQL-specific")
+    def test_postgresql_advisory_lock_is_released_after_the_block(self):
+        lock_id = advisory_lock_id("test:pg")
+        # A bigint key shows up in pg_locks split into classid (high half) and objid (low half).
+        key = [(lock_id >> 32) & 0xFFFFFFFF, lock_id & 0xFFFFFFFF]
+        held = "SELECT count(*) FROM pg_locks WHERE locktype = 'advisory' AND granted AND classid = %s AND objid = %s"
+
+        with single_flight("test:pg"):
+            with connection.cursor() as cursor:
+                cursor.execute(held, key)
+                self.assertEqual(cursor.fetchone()[0], 1)
+
+        with connection.cursor() as cursor:
+            cursor.execute(held, key)
+            self.assertEqual(cursor.fetchone()[0], 0)
+
+    def test_request_otp_answers_503_when_the_issuing_request_is_stuck(self):
+        with mock.patch("apps.accounts.api.auth.views.single_flight", side_effect=LockTimeout("otp")):
+            response = APIClient().post(reverse('auth-request-otp'), {"address": "+998901234567"}, format='json')
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.data["detail"].code, "otp_issue_in_progress")
+
+
+class AdvisoryLockBranchTests(SimpleTestCase):
+    """The PostgreSQL branch against a scripted cursor, so it is covered without a PostgreSQL server."""
+
+    def _connection(self, acquired: list[bool]):
+        fake = mock.MagicMock(vendor="postgresql")
+        cursor = fake.cursor.return_value.__enter__.return_value
+        cursor.fetchone.side_effect = [(value,) for value in acquired]
+        return fake, cursor
+
+    def test_polls_try_lock_until_granted_then_unlocks(self):
+        fake, cursor = self._connection([False, False, True])
+
+        with mock.patch("core.locks.connections", {"default": fake}), mock.patch("core.locks.POLL_INTERVAL", 0):
+            with single_flight("test:pg", timeout=1):
+                pass
+
+        statements = [call.args[0] for call in cursor.execute.call_args_list]
+        self.assertEqual(statements, ["SELECT pg_try_advisory_lock(%s)"] * 3 + ["SELECT pg_advisory_unlock(%s)"])
+        self.assertEqual({call.args[1][0] for call in cursor.execute.call_args_list}, {advisory_lock_id("test:pg")})
+
+    def test_gives_up_after_the_timeout_without_unlocking(self):
+        fake, cursor = self._connection([False] * 1000)
+
+        with mock.patch("core.locks.connections", {"default": fake}):
+            with self.assertRaises(LockTimeout):
+                with single_flight("test:pg", timeout=0.05):
+                    self.fail("entered the block without the lock")
+
+        self.assertNotIn("SELECT pg_advisory_unlock(%s)", [call.args[0] for call in cursor.execute.call_args_list])
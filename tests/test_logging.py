@@ -0,0 +1,159 @@
+import gc
+import io
+import json
+import logging
+import threading
+import time
+
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from apps.accounts.models import OTPVerificationSession
+from core import logs
+from core.logs import JSONFormatter, NonBlockingQueueHandler, RedactingFilter, redact
+
+
+class _BlockingStream(io.StringIO):
+    """A stderr that hangs until released, like a stalled journald pipe."""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def write(self, text):
+        self.release.wait()
+        return super().write(text)
+
+
+def _record(msg, *args, level=logging.INFO, **extra):
+    record = logging.LogRecord("tests", level, __file__, 1, msg, args, None)
+    for key, value in extra.items():
+        setattr(record, key, value)
+    return record
+
+
+class RedactionTests(SimpleTestCase):
+    def test_masks_sensitive_key_values(self):
+        self.assertEqual(redact("otp_code=1234 address=+998901234567"), "otp_code=[REDACTED] address=+998901234567")
+        self.assertEqual(redact('{"client_secret": "s3cret", "lang": "uz"}'), '{"client_secret": "[REDACTED]", "lang": "uz"}')
+
+    def test_masks_jwts_anywhere(self):
+        self.assertEqual(redact("Bearer eyJhbGciOi.eyJzdWIiOjF9.c2lnbmF0dXJl"), "Bearer [REDACTED]")
+
+    def test_filter_redacts_message_and_extra_fields(self):
+        record = _record("verify %s", "otp=9876", payload={"otp_code": "9876", "lang": "uz"}, password="hunter2")
+
+        RedactingFilter().filter(record)
+        entry = json.loads(JSONFormatter().format(record))
+
+        self.assertEqual(entry["msg"], "verify otp=[REDACTED]")
+        self.assertEqual(entry["payload"], {"otp_code": "[REDACTED]", "lang": "uz"})
+        self.assertEqual(entry["password"], "[REDACTED]")
+        self.assertEqual(entry["level"], "INFO")
+
+
+class NonBlockingQueueHandlerTests(SimpleTestCase):
+    def test_records_are_written_as_json_lines(self):
+        stream = io.StringIO()
+        handler = NonBlockingQueueHandler(stream=stream)
+
+        handler.handle(_record("hello %s", "world", request_id="abc"))
+        handler.close()
+
+        entry = json.loads(stream.getvalue())
+        self.assertEqual(entry["msg"], "hello world")
+        self.assertEqual(entry["request_id"], "abc")
+
+    def test_stalled_stream_drops_instead_of_blocking(self):
+        stream = _BlockingStream()
+        handler = NonBlockingQueueHandler(maxsize=4, stream=stream)
+
+        started = time.perf_counter()
+        for index in range(50):
+            handler.handle(_record("event %d", index, level=logging.WARNING))
+        elapsed = time.perf_counter() - started
+
+        self.assertLess(elapsed, 1.0)
+        self.assertGreater(handler.dropped, 0)
+
+        stream.release.set()
+        handler.close()
+        self.assertIn("Dropped", stream.getvalue())
+
+    def test_info_is_shed_before_the_queue_is_full(self):
+        stream = _BlockingStream()
+        handler = NonBlockingQueueHandler(maxsize=100, shed_threshold=0.1, overload_sample_rate=0.0, stream=stream)
+
+        for index in range(50):
+            handler.handle(_record("event %d", index))
+        handler.handle(_record("still kept", level=logging.ERROR))
+
+        # The writer holds one record; ten wait in the queue before shedding starts, plus the error.
+        self.assertLessEqual(handler.queue.qsize(), 12)
+        self.assertGreaterEqual(handler.dropped, 38)
+
+        stream.release.set()
+        handler.close()
+        self.assertIn("still kept", stream.getvalue())
+
+
+    def test_retired_handlers_are_not_kept_alive(self):
+        before = len(logs._live_handlers)
+        for _ in range(5):
+            handler = NonBlockingQueueHandler(stream=io.StringIO())
+            handler.handle(_record("configured"))
+            handler.close()
+        del handler
+        gc.collect()
+
+        self.assertEqual(len(logs._live_handlers), before)
+
+    def test_fork_hook_resets_live_handlers(self):
+        handler = NonBlockingQueueHandler(stream=io.StringIO())
+        self.addCleanup(handler.close)
+        parent_queue = handler.queue
+
+        logs._reset_after_fork()
+
+        self.assertIsNot(handler.queue, parent_queue)
+        self.assertIsNone(handler._writer)
+
+
+class AccessLogMiddlewareTests(APITestCase):
+    def test_logs_one_structured_line_per_request(self):
+        with self.assertLogs("core.access", level="INFO") as logs:
+            response = self.client.post(reverse('auth-request-otp'), {"address": "+998901234567"}, format='json')
+
+        self.assertEqual(len(logs.records), 1)
+        record = logs.records[0]
+        self.assertEqual(record.view, "auth-request-otp")
+        self.assertEqual(record.status, 200)
+        self.assertGreater(record.db_queries, 0)
+        self.assertGreaterEqual(record.db_ms, 0)
+        self.assertEqual(response["X-Request-ID"], record.request_id)
+
+    def test_propagates_a_sane_incoming_request_id(self):
+        with self.assertLogs("core.access", level="INFO") as logs:
+            response = self.client.post(
+                reverse('auth-request-otp'), {"address": "+998901234567"}, format='json', HTTP_X_REQUEST_ID="nginx-1234.5"
+            )
+
+        self.assertEqual(response["X-Request-ID"], "nginx-1234.5")
+        self.assertEqual(logs.records[0].request_id, "nginx-1234.5")
+
+    def test_replaces_a_malformed_request_id(self):
+        response = self.client.post(
+            reverse('auth-request-otp'), {"address": "+998901234567"}, format='json', HTTP_X_REQUEST_ID="bad id;x"
+        )
+
+        self.assertRegex(response["X-Request-ID"], r"^[0-9a-f]{32}$")
+
+    def test_mock_sms_logs_neither_the_code_nor_the_full_number(self):
+        with self.assertLogs("apps.accounts.api.auth.views", level="INFO") as logs:
+            response = self.client.post(reverse('auth-request-otp'), {"address": "+998901234567"}, format='json')
+
+        output = "\n".join(logs.output)
+        otp_code = OTPVerificationSession.objects.get(id=response.data["session"]).otp_code
+        self.assertNotIn(otp_code, output)
+        self.assertNotIn("+998901234567", output)
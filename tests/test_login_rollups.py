@@ -0,0 +1,145 @@
+import io
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.accounts import rollups
+from apps.accounts.models import DeviceProfile, LoginRollup, OTPVerificationSession, RollupWatermark, User
+
+
+def _consumed_session(consumed_at, payload=None, legacy=None) -> OTPVerificationSession:
+    session = OTPVerificationSession.objects.create(
+        address="+998901234567", otp_code="1234", expires_at=consumed_at + OTPVerificationSession.OTP_TTL
+    )
+    if payload is not None:
+        session.consume(payload)
+    OTPVerificationSession.objects.filter(id=session.id).update(consumed_at=consumed_at, session_data=legacy or {})
+    return session
+
+
+class LoginRollupTests(TestCase):
+    def setUp(self):
+        DeviceProfile.objects.clear_cache()
+        self.hour = timezone.now().replace(minute=0, second=0, microsecond=0) - timedelta(hours=3)
+
+    def _rollups(self) -> dict:
+        return {
+            (rollup.hour, rollup.platform, rollup.app_version, rollup.referral_code): rollup.logins
+            for rollup in LoginRollup.objects.all()
+        }
+
+    def test_counts_new_and_legacy_sessions_by_hour_and_dimensions(self):
+        android = {"session_data": {"platform": "ANDROID", "app_version": "2.4.1"}, "referral_code": "REF1"}
+        _consumed_session(self.hour + timedelta(minutes=5), android)
+        _consumed_session(self.hour + timedelta(minutes=50), android)
+        _consumed_session(
+            self.hour + timedelta(minutes=10),
+            legacy={"session_data": {"platform": "IOS", "app_version": "2.3.0"}, "referral_code": None},
+        )
+        _consumed_session(self.hour + timedelta(hours=1), {"session_data": {}})
+        OTPVerificationSession.objects.create(address="+998901234568", otp_code="1234", expires_at=timezone.now())
+
+        self.assertEqual(rollups.advance(), 4)
+
+        self.assertEqual(self._rollups(), {
+            (self.hour, "ANDROID", "2.4.1", "REF1"): 2,
+            (self.hour, "IOS", "2.3.0", ""): 1,
+            (self.hour + timedelta(hours=1), "", "", ""): 1,
+        })
+
+    def test_runs_are_incremental(self):
+        payload = {"session_data": {"platform": "ANDROID"}}
+        _consumed_session(self.hour + timedelta(minutes=1), payload)
+        rollups.advance()
+        position = RollupWatermark.objects.get(name=rollups.WATERMARK_NAME).position
+
+        self.assertEqual(rollups.advance(), 0)
+
+        _consumed_session(position + timedelta(seconds=1), payload)
+        self.assertEqual(rollups.advance(lag=timedelta(0)), 1)
+        self.assertEqual(sum(self._rollups().values()), 2)
+
+    def test_recent_logins_wait_for_the_lag(self):
+        _consumed_session(timezone.now() - timedelta(minutes=1), {"session_data": {"platform": "WEB"}})
+
+        self.assertEqual(rollups.advance(lag=timedelta(minutes=5)), 0)
+        self.assertEqual(rollups.advance(lag=timedelta(0)), 1)
+
+    def test_backfill_is_split_into_windows(self):
+        for days in (1, 2, 3):
+            _consumed_session(self.hour - timedelta(days=days), {"session_data": {"platform": "IOS"}})
+
+        with CaptureQueriesContext(connection) as queries:
+            rollups.advance(window=timedelta(days=1))
+
+        window_queries = [query for query in queries if "GROUP BY" in query["sql"]]
+        self.assertGreaterEqual(len(window_queries), 3)
+        self.assertEqual(sum(self._rollups().values()), 3)
+
+    def test_rebuild_recomputes_from_scratch(self):
+        _consumed_session(self.hour, {"session_data": {"platform": "IOS"}})
+        call_command("rollup_logins", stdout=io.StringIO())
+        LoginRollup.objects.update(logins=99)
+
+        call_command("rollup_logins", "--rebuild", stdout=io.StringIO())
+
+        self.assertEqual(list(LoginRollup.objects.values_list("logins", flat=True)), [1])
+
+
+class LoginAnalyticsAPITests(APITestCase):
+    def setUp(self):
+        self.url = reverse('analytics-logins')
+        self.staff = User.objects.create_user(phone_number="+998900000001", is_staff=True)
+        day = timezone.localtime().replace(hour=10, minute=0, second=0, microsecond=0) - timedelta(days=1)
+        self.day = day.date()
+        LoginRollup.objects.bulk_create([
+            LoginRollup(hour=day, platform="ANDROID", app_version="2.4.1", logins=3),
+            LoginRollup(hour=day + timedelta(hours=2), platform="ANDROID", app_version="2.4.0", logins=2),
+            LoginRollup(hour=day + timedelta(hours=2), platform="IOS", app_version="2.4.1", referral_code="R", logins=1),
+        ])
+
+    def _authenticate(self, user):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(user).access_token}")
+
+    def test_daily_logins_by_platform(self):
+        self._authenticate(self.staff)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {"start": self.day, "end": self.day, "group_by": "platform"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(row["platform"], row["logins"]) for row in response.data["results"]], [("ANDROID", 5), ("IOS", 1)]
+        )
+        self.assertFalse(any("accounts_otpverificationsession" in query["sql"] for query in queries))
+
+    def test_hourly_logins_filtered_by_app_version(self):
+        self._authenticate(self.staff)
+
+        response = self.client.get(
+            self.url, {"start": self.day, "end": self.day, "interval": "hour", "app_version": "2.4.1"}
+        )
+
+        self.assertEqual([row["logins"] for row in response.data["results"]], [3, 1])
+
+    def test_rejects_inverted_range(self):
+        self._authenticate(self.staff)
+
+        response = self.client.get(self.url, {"start": self.day, "end": self.day - timedelta(days=1)})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("end", response.data)
+
+    def test_staff_only(self):
+        self._authenticate(User.objects.create_user(phone_number="+998900000002"))
+
+        response = self.client.get(self.url, {"start": self.day, "end": self.day})
+
+        self.assertEqual(response.status_code, 403)
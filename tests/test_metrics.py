@@ -0,0 +1,93 @@
+import os
+import re
+import tempfile
+import threading
+from pathlib import Path
+
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from core import metrics
+
+
+def sample(text: str, line_prefix: str) -> float:
+    match = re.search(rf"^{re.escape(line_prefix)} (\S+)$", text, re.MULTILINE)
+    return float(match.group(1)) if match else 0.0
+
+
+class ShardTests(SimpleTestCase):
+    def test_shard_round_trip_survives_growth(self):
+        shard = metrics.Shard()
+        for index in range(5000):
+            shard.add(f"metric\tindex=\"{index}\"\tvalue", index)
+        shard.add("metric\tindex=\"0\"\tvalue", 2.5)
+
+        values = dict(metrics.read_shard(shard.snapshot()))
+
+        self.assertGreater(shard.size, metrics.INITIAL_SHARD_SIZE)
+        self.assertEqual(len(values), 5000)
+        self.assertEqual(values["metric\tindex=\"0\"\tvalue"], 2.5)
+        self.assertEqual(values["metric\tindex=\"4999\"\tvalue"], 4999)
+
+
+class MultiProcessStoreTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.enterContext(override_settings(METRICS_DIR=self.directory))
+        self.store = metrics.ShardStore()
+
+    def _write_from_thread(self, key: str, amount: float) -> None:
+        def run():
+            self.store.new_shard().add(key, amount)
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        thread.join()
+
+    def test_collect_sums_every_shard_file(self):
+        self._write_from_thread("c\t\tvalue", 2)
+        self._write_from_thread("c\t\tvalue", 3)
+
+        self.assertEqual(len(list(Path(self.directory).glob("*.db"))), 2)
+        self.assertEqual(self.store.collect()["c\t\tvalue"], 5)
+
+    def test_dead_worker_shards_are_folded_into_archive(self):
+        self._write_from_thread("c\t\tvalue", 2)
+        self._write_from_thread("c\t\tvalue", 3)
+
+        metrics.merge_dead_process(self.directory, os.getpid())
+
+        self.assertEqual(list(Path(self.directory).glob("*.db")), [])
+        self.assertEqual(self.store.collect()["c\t\tvalue"], 5)
+
+        metrics.clear_metrics_dir(self.directory)
+        self.assertEqual(dict(self.store.collect()), {})
+
+
+class MetricsEndpointTests(APITestCase):
+    def test_otp_request_is_counted_and_exposed(self):
+        before = self.client.get(reverse('metrics')).content.decode()
+
+        self.client.post(reverse('auth-request-otp'), {"address": "+998901234567"}, format='json')
+        self.client.post(reverse('auth-request-otp'), {"address": "+998901234567"}, format='json')
+        response = self.client.get(reverse('metrics'))
+        after = response.content.decode()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        for event in ("issued", "throttled"):
+            line = f'otp_events_total{{event="{event}"}}'
+            self.assertEqual(sample(after, line) - sample(before, line), 1)
+
+        view = 'view="auth-request-otp"'
+        self.assertEqual(
+            sample(after, f"http_request_duration_seconds_count{{{view}}}")
+            - sample(before, f"http_request_duration_seconds_count{{{view}}}"),
+            2,
+        )
+        self.assertEqual(
+            sample(after, f'http_request_duration_seconds_bucket{{{view},le="+Inf"}}'),
+            sample(after, f"http_request_duration_seconds_count{{{view}}}"),
+        )
+        self.assertIn("# TYPE sms_send_duration_seconds histogram", after)
@@ -0,0 +1,87 @@
+import gzip
+import json
+import tempfile
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+
+from core import openapi
+
+
+class OpenAPISchemaTests(SimpleTestCase):
+    def setUp(self):
+        self.schema_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.schema_dir.cleanup)
+        settings_override = override_settings(OPENAPI_SCHEMA_DIR=self.schema_dir.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        openapi.get_schema_documents.cache_clear()
+        self.addCleanup(openapi.get_schema_documents.cache_clear)
+
+    def test_schema_json_is_generated_once_per_process(self):
+        with mock.patch.object(openapi, "render_schema", wraps=openapi.render_schema) as render:
+            first = self.client.get(reverse('schema-json'))
+            second = self.client.get(reverse('schema-json'))
+            self.client.get(reverse('schema-yaml'))
+
+        self.assertEqual(render.call_count, 1)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first["Content-Type"], "application/json")
+        schema = json.loads(first.content)
+        self.assertEqual(schema["basePath"], "/api/v1/auth")
+        self.assertIn("/login/", schema["paths"])
+        self.assertEqual(first["ETag"], second["ETag"])
+
+    def test_if_none_match_returns_not_modified(self):
+        etag = self.client.get(reverse('schema-yaml'))["ETag"]
+
+        response = self.client.get(reverse('schema-yaml'), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response["ETag"], etag)
+
+    def test_gzip_variant_has_its_own_etag(self):
+        plain = self.client.get(reverse('schema-json'))
+        compressed = self.client.get(reverse('schema-json'), HTTP_ACCEPT_ENCODING="gzip, br")
+
+        self.assertEqual(compressed["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(compressed.content), plain.content)
+        self.assertNotEqual(compressed["ETag"], plain["ETag"])
+        self.assertIn("Accept-Encoding", compressed["Vary"])
+
+    def test_etag_only_validates_its_own_representation(self):
+        plain = self.client.get(reverse('schema-json'))["ETag"]
+        compressed = self.client.get(reverse('schema-json'), HTTP_ACCEPT_ENCODING="gzip")["ETag"]
+
+        response = self.client.get(reverse('schema-json'), HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=plain)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["ETag"], compressed)
+
+        response = self.client.get(reverse('schema-json'), HTTP_IF_NONE_MATCH=compressed)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["ETag"], plain)
+
+    def test_gzip_is_chosen_by_q_value(self):
+        for accept_encoding, gzipped in (
+            ("gzip;q=0", False),
+            ("br, gzip; q=0.0", False),
+            ("*;q=0", False),
+            ("gzip;q=0.5, identity", True),
+            ("br, *", True),
+            ("*, gzip;q=0", False),
+        ):
+            with self.subTest(accept_encoding=accept_encoding):
+                response = self.client.get(reverse('schema-json'), HTTP_ACCEPT_ENCODING=accept_encoding)
+                self.assertEqual(response.get("Content-Encoding") == "gzip", gzipped)
+
+    def test_prebuilt_schema_is_served_without_generation(self):
+        call_command("build_openapi_schema", output_dir=self.schema_dir.name, stdout=mock.MagicMock())
+
+        with mock.patch.object(openapi, "render_schema") as render:
+            response = self.client.get(reverse('schema-json'), HTTP_ACCEPT_ENCODING="gzip")
+
+        render.assert_not_called()
+        self.assertIn("/request-otp/", json.loads(gzip.decompress(response.content))["paths"])
@@ -0,0 +1,80 @@
+import tempfile
+import threading
+import time
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import RequestFactory, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from core import profiling
+
+
+def busy_wait(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(1000))
+
+
+class ProfilingTests(APITestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.enterContext(override_settings(PROFILE_DIR=self.directory, PROFILE_INTERVAL_MS=1, PROFILE_SAMPLE_RATE=0))
+        profiling._profiler = None
+        self.addCleanup(setattr, profiling, "_profiler", None)
+
+    def _request_otp(self, **headers):
+        return self.client.post(reverse('auth-request-otp'), {"address": "+998901234567"}, format='json', headers=headers)
+
+    def test_signed_header_profiles_request(self):
+        response = self._request_otp(**{profiling.TOKEN_HEADER: profiling.issue_token()})
+
+        dump = response["X-Profile-Dump"]
+        match = profiling.DUMP_NAME.match(dump)
+        self.assertEqual(match["view"], "auth-request-otp")
+        self.assertTrue((Path(self.directory) / dump).exists())
+
+    def test_invalid_token_and_zero_rate_do_not_profile(self):
+        response = self._request_otp(**{profiling.TOKEN_HEADER: "profile:forged:signature"})
+
+        self.assertNotIn("X-Profile-Dump", response)
+        self.assertEqual(list(Path(self.directory).iterdir()), [])
+
+    def test_signal_toggles_profiling_window(self):
+        profiler = profiling.get_profiler()
+        request = RequestFactory().post("/api/v1/auth/login/")
+
+        profiler.toggle_signal_window()
+        self.assertTrue(profiler.should_profile(request))
+        profiler.toggle_signal_window()
+        self.assertFalse(profiler.should_profile(request))
+
+    def test_sampler_records_target_thread_stack(self):
+        stop = threading.Event()
+        thread = threading.Thread(target=busy_wait, args=(stop,))
+        thread.start()
+        sampler = profiling.StackSampler(0.001)
+
+        sampler.start(thread.ident)
+        time.sleep(0.05)
+        stacks = sampler.stop(thread.ident)
+        stop.set()
+        thread.join()
+
+        self.assertTrue(stacks)
+        self.assertTrue(all("busy_wait (tests/test_profiling.py" in stack for stack in stacks))
+
+    def test_report_merges_dumps(self):
+        directory = Path(self.directory)
+        (directory / "1-10-auth-login-40ms.folded").write_text("main;view;jwt_sign 3\nmain;view;db 1\n")
+        (directory / "2-11-auth-login-20ms.folded").write_text("main;view;jwt_sign 4\n")
+        out = StringIO()
+        merged = directory / "merged.txt"
+
+        call_command("profile_report", "--dir", self.directory, "--output", str(merged), stdout=out)
+
+        report = out.getvalue()
+        self.assertIn("auth-login", report)
+        self.assertIn("87.5%  jwt_sign", report)
+        self.assertIn("main;view;jwt_sign 7\n", merged.read_text())
@@ -0,0 +1,55 @@
+import json
+
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from apps.accounts.api.auth.views import OTPWorkflowService
+from apps.accounts.models import OTPVerificationSession
+
+
+@override_settings(REQUEST_TIMING_ENABLED=True, REQUEST_TIMING_SAMPLE_RATE=1.0)
+class ServerTimingTests(APITestCase):
+    def _server_timing(self, response) -> dict[str, str]:
+        return dict(metric.strip().split(";", 1) for metric in response["Server-Timing"].split(","))
+
+    def test_request_otp_reports_db_sms_and_render_sections(self):
+        with self.assertLogs("core.timing", level="INFO") as logs:
+            response = self.client.post(reverse('auth-request-otp'), {"address": "+998901234567"}, format='json')
+
+        sections = self._server_timing(response)
+        self.assertEqual(set(sections), {"db", "sms", "render", "total"})
+
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record["event"], "request_timing")
+        self.assertEqual(record["status"], 200)
+        self.assertEqual(record["sections"]["sms"]["count"], 1)
+        self.assertGreater(record["sections"]["db"]["count"], 0)
+
+    def test_login_reports_jwt_section(self):
+        session = OTPVerificationSession.objects.create(
+            address=OTPWorkflowService.TEST_PHONE,
+            otp_code=OTPWorkflowService.TEST_OTP,
+            expires_at=timezone.now() + OTPVerificationSession.OTP_TTL,
+            is_verified=True,
+        )
+
+        response = self.client.post(
+            reverse('auth-login'), {"verification_data": {"session": str(session.id)}}, format='json'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("jwt", self._server_timing(response))
+
+    @override_settings(REQUEST_TIMING_SAMPLE_RATE=0.0)
+    def test_unsampled_requests_have_no_header(self):
+        response = self.client.post(reverse('auth-request-otp'), {"address": "+998901234567"}, format='json')
+
+        self.assertNotIn("Server-Timing", response)
+
+    @override_settings(REQUEST_TIMING_ENABLED=False)
+    def test_disabled_by_default(self):
+        response = self.client.post(reverse('auth-request-otp'), {"address": "+998901234567"}, format='json')
+
+        self.assertNotIn("Server-Timing", response)
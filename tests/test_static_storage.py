@@ -0,0 +1,44 @@
+import gzip
+import shutil
+import tempfile
+from unittest import skipUnless
+
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase
+
+from core import storage
+from core.storage import CompressedManifestStaticFilesStorage
+
+
+class CompressedManifestStorageTests(SimpleTestCase):
+    def setUp(self):
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location)
+        self.storage = CompressedManifestStaticFilesStorage(location=location, base_url="/static/")
+        self.css = b"body { color: #333; }\n" * 50
+        self.storage.save("app.css", ContentFile(self.css))
+        self.storage.save("logo.png", ContentFile(b"\x89PNG" * 100))
+
+    def _collect(self):
+        paths = {name: (self.storage, name) for name in ("app.css", "logo.png")}
+        return list(self.storage.post_process(paths))
+
+    def test_hashed_text_assets_get_gzip_siblings(self):
+        self._collect()
+        hashed = self.storage.stored_name("app.css")
+
+        self.assertRegex(hashed, r"^app\.[0-9a-f]{12}\.css$")
+        with self.storage.open(hashed + ".gz") as compressed:
+            self.assertEqual(gzip.decompress(compressed.read()), self.css)
+        self.assertFalse(self.storage.exists("app.css.gz"))
+        self.assertFalse(self.storage.exists(self.storage.stored_name("logo.png") + ".gz"))
+
+    @skipUnless(storage.brotli, "brotli is not installed")
+    def test_hashed_text_assets_get_brotli_siblings(self):
+        self._collect()
+
+        with self.storage.open(self.storage.stored_name("app.css") + ".br") as compressed:
+            self.assertEqual(storage.brotli.decompress(compressed.read()), self.css)
+
+    def test_unhashed_names_are_served_until_collectstatic_runs(self):
+        self.assertEqual(self.storage.url("app.css"), "/static/app.css")